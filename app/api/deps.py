@@ -1,11 +1,16 @@
 # app/api/deps.py
+from datetime import date
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 
 from app.crud import crud
+from app.crud import pagination
 from app.core import security
+from app.core.logging_config import set_request_user
 from app.models import models
+from app.schemas import schemas
 from app.db.database import get_db_session
 
 # OAuth2PasswordBearer define a URL onde o cliente pode obter o token
@@ -14,10 +19,11 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token") # Ajustado p
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db_session)
-) -> models.UserOrm:
+) -> schemas.Principal:
     """
-    Decodifica o token, obtém o username e busca o usuário no banco.
+    Decodifica o token, obtém o username e busca o usuário no banco (ou no cache de principals).
     Levanta HTTPException se o token for inválido ou o usuário não for encontrado.
+    Retorna só id, username e flags; rotas que precisam do usuário completo devem buscá-lo.
     """
     username = security.decode_access_token(token)
     if not username:
@@ -26,23 +32,62 @@ async def get_current_user(
             detail="Token inválido ou expirado",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = await crud.get_user_by_username(db, username=username)
+    user = security.principal_cache.get(username)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuário não encontrado com este token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        db_user = await crud.get_user_by_username(db, username=username)
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuário não encontrado com este token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user = schemas.Principal.model_validate(db_user)
+        security.principal_cache.set(username, user)
+        # Devolve a conexão ao pool: em várias rotas esta é a única consulta da requisição
+        # (a sessão continua utilizável e abre outra conexão se a rota precisar)
+        await db.close()
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário inativo")
+    set_request_user(user.id)
     return user
 
 async def get_current_active_superuser(
-    current_user: models.UserOrm = Depends(get_current_user)
-) -> models.UserOrm:
+    current_user: schemas.Principal = Depends(get_current_user)
+) -> schemas.Principal:
     """Verifica se o usuário atual é um superusuário ativo."""
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Permissão de superusuário necessária"
         )
     return current_user
+
+def get_page_cursor(
+    after: Optional[str] = Query(
+        None, description="Cursor opaco retornado no header X-Next-Cursor da página anterior"
+    )
+) -> Optional[pagination.Cursor]:
+    """Decodifica o parâmetro 'after' das listagens paginadas por cursor."""
+    if after is None:
+        return None
+    try:
+        return pagination.decode_cursor(after)
+    except pagination.InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor 'after' inválido")
+
+def get_material_filters(
+    status_filter: Optional[models.MaterialStatusEnum] = Query(None, alias="status"),
+    material_type: Optional[models.MaterialTypeEnum] = None,
+    author_id: Optional[int] = None,
+    uploader_id: Optional[int] = None,
+    published_from: Optional[date] = Query(None, description="publication_date a partir desta data (inclusive)"),
+    published_to: Optional[date] = Query(None, description="publication_date até esta data (inclusive)"),
+) -> schemas.MaterialFilters:
+    """Filtros opcionais da listagem de materiais (combinados com AND)."""
+    return schemas.MaterialFilters(
+        status=status_filter,
+        material_type=material_type,
+        author_id=author_id,
+        uploader_id=uploader_id,
+        published_from=published_from,
+        published_to=published_to,
+    )
@@ -0,0 +1,96 @@
+# app/api/responses.py
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response, status
+
+from app.core.response_cache import response_cache
+from app.schemas import schemas
+
+
+def json_response(
+    content: Any, status_code: int = status.HTTP_200_OK, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Resposta JSON já renderizada com orjson (datas, datetimes e enums são serializados nativamente).
+    Retornar um Response faz o FastAPI pular a validação/serialização pelo response_model,
+    mas o schema documentado no OpenAPI continua sendo o do response_model da rota.
+    """
+    return Response(
+        content=orjson.dumps(content, option=orjson.OPT_UTC_Z),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def next_cursor_headers(next_cursor: Optional[str]) -> Dict[str, str]:
+    return {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+def total_count_headers(total: Optional[schemas.TotalCount]) -> Dict[str, str]:
+    # X-Total-Count-Exact: false quando o total é a estimativa do planejador
+    if total is None:
+        return {}
+    return {"X-Total-Count": str(total.count), "X-Total-Count-Exact": "true" if total.exact else "false"}
+
+
+# --- Cache de respostas do catálogo ---
+
+def _cache_key(request: Request) -> str:
+    # Rota + query params em ordem canônica (?a=1&b=2 e ?b=2&a=1 são a mesma entrada)
+    params = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+    return f"rest:{request.url.path}?{params}"
+
+def _last_modified(content: Any) -> Optional[str]:
+    # Só para um recurso único: numa lista, remoções e itens que mudam de página não alteram
+    # o maior time_updated, então listas são validadas apenas pelo ETag.
+    if not isinstance(content, dict):
+        return None
+    stamp = content.get("time_updated") or content.get("time_created")
+    if not isinstance(stamp, datetime):
+        return None
+    return format_datetime(stamp.astimezone(timezone.utc), usegmt=True)
+
+def _not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None: # tem precedência sobre If-Modified-Since
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or headers["ETag"] in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and "Last-Modified" in headers:
+        try:
+            return parsedate_to_datetime(headers["Last-Modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+async def cached_json_response(
+    request: Request, build: Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]]
+) -> Response:
+    """
+    Resposta JSON read-through pelo cache do catálogo (requer RESPONSE_CACHE_BACKEND configurado).
+    'build' só é chamado em cache miss e devolve (conteúdo, headers extras); exceções como o 404
+    passam direto e não são cacheadas. Emite ETag (hash do corpo) e Last-Modified (time_updated),
+    e responde 304 Not Modified quando o cliente já tem a versão atual.
+    """
+    key = _cache_key(request)
+    entry = await response_cache.get(key)
+    if entry is not None:
+        raw_headers, body = entry.split(b"\n", 1)
+        headers = orjson.loads(raw_headers)
+    else:
+        content, headers = await build()
+        body = orjson.dumps(content, option=orjson.OPT_UTC_Z)
+        headers = {**headers, "ETag": f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'}
+        last_modified = _last_modified(content)
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+        await response_cache.set(key, orjson.dumps(headers) + b"\n" + body)
+
+    headers["Cache-Control"] = "no-cache" # o cliente pode guardar, mas deve revalidar
+    if _not_modified(request, headers):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, headers=headers, media_type="application/json")
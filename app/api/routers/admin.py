@@ -0,0 +1,65 @@
+# app/api/routers/admin.py
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.core import security
+from app.crud import crud
+from app.db import database
+from app.db import slow_queries
+from app.schemas import schemas as pydantic_schemas
+from app.api import deps # Importa as dependências
+from app.api.routing import DBSessionRoute
+
+router = APIRouter(route_class=DBSessionRoute)
+
+@router.get("/password-hashing")
+async def read_password_hashing_stats(
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_active_superuser)
+) -> Dict[str, Any]:
+    """
+    Estatísticas do pool de hashing de senhas (bcrypt): limite de concorrência, operações em andamento
+    e histogramas (em segundos) do tempo de fila e de execução. Apenas para superusuários.
+    """
+    return security.password_hashing_stats()
+
+@router.get("/principal-cache")
+async def read_principal_cache_stats(
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_active_superuser)
+) -> Dict[str, Any]:
+    """
+    Estatísticas do cache de usuários autenticados deste worker (tamanho, acertos, erros e taxa de acerto),
+    para dimensionar PRINCIPAL_CACHE_SIZE e PRINCIPAL_CACHE_TTL_SECONDS. Apenas para superusuários.
+    """
+    return security.principal_cache.stats()
+
+@router.get("/author-suggestions-cache")
+async def read_author_suggestions_cache_stats(
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_active_superuser)
+) -> Dict[str, Any]:
+    """
+    Estatísticas do cache de prefixos de GET /authors/suggest deste worker, para dimensionar
+    AUTHOR_SUGGEST_CACHE_SIZE e AUTHOR_SUGGEST_CACHE_MAX_PREFIX. Apenas para superusuários.
+    """
+    return crud.author_suggestions_cache.stats()
+
+@router.get("/db-pool")
+async def read_db_pool_stats(
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_active_superuser)
+) -> Dict[str, Any]:
+    """
+    Estado do pool de conexões deste worker (conexões em uso, overflow, timeouts de checkout) e
+    histograma do tempo de checkout, para separar espera por conexão de latência do Postgres.
+    """
+    return database.pool_stats()
+
+@router.get("/slow-queries")
+async def read_slow_queries(
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_active_superuser)
+) -> Dict[str, Any]:
+    """
+    Queries mais lentas registradas por este worker (SLOW_QUERY_LOG), uma por SQL normalizado, da pior
+    para a melhor: chamadas acima do limite, tempos, rota e parâmetros (redigidos) da execução mais lenta
+    e, fora de produção, o plano dela (EXPLAIN ANALYZE, BUFFERS). Apenas para superusuários.
+    """
+    return slow_queries.slow_query_report()
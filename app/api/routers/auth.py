@@ -7,8 +7,9 @@ from app.crud import crud
 from app.schemas import schemas as pydantic_schemas
 from app.core import security
 from app.api import deps 
+from app.api.routing import DBSessionRoute
 
-router = APIRouter()
+router = APIRouter(route_class=DBSessionRoute)
 
 @router.post("/token", response_model=pydantic_schemas.Token)
 async def login_for_access_token(
@@ -20,7 +21,10 @@ async def login_for_access_token(
     Usa OAuth2PasswordRequestForm, que espera 'username' e 'password' em form-data.
     """
     user = await crud.get_user_by_username(db, username=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    # Devolve a conexão ao pool antes do bcrypt: a espera na fila de hashing e o hash em si levam
+    # centenas de ms, e uma rajada de logins prenderia o pool inteiro (o usuário já está carregado)
+    await db.close()
+    if not user or not await security.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário ou senha incorretos",
@@ -1,22 +1,28 @@
 # app/api/routers/authors.py
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import functools
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 import sqlalchemy.exc
-import asyncpg
 
 from app.api import deps # Importa as dependências
+from app.api.routing import DBSessionRoute
+from app.api import responses
+from app.core.config import settings
+from app.core.response_cache import response_cache
+from app.db.database import get_read_db_session
 from app.crud import crud # Importa os módulos
-from app.models import models as orm_models
+from app.crud import pagination
 from app.schemas import schemas as pydantic_schemas
 
-router = APIRouter()
+router = APIRouter(route_class=DBSessionRoute)
 
 @router.post("/", response_model=pydantic_schemas.Author, status_code=status.HTTP_201_CREATED)
 async def create_new_author(
     author_in: pydantic_schemas.AuthorCreate,
     db: AsyncSession = Depends(deps.get_db_session),
-    current_user: orm_models.UserOrm = Depends(deps.get_current_user) # Protegendo o endpoint
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_user) # Protegendo o endpoint
 ):
     """
     Cria um novo autor. Requer autenticação.
@@ -27,26 +33,88 @@ async def create_new_author(
     except sqlalchemy.exc.IntegrityError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Erro de integridade dos dados ao criar autor: {e.orig}")
 
+async def _authors_page_rows(
+    db: AsyncSession, skip: int, limit: int, after: Optional[pagination.Cursor], include_total: bool
+) -> Tuple[List[dict], Dict[str, str]]:
+    # Leitura por linhas (FAST_JSON_RESPONSES e cache de respostas); busca um item a mais
+    # só para saber se existe uma próxima página
+    rows = await crud.get_authors_rows_crud(db, skip=skip, limit=limit + 1, after=after)
+    rows, next_cursor = pagination.split_page(
+        rows, limit, "id", sort_value=itemgetter("id"), id_of=itemgetter("id")
+    )
+    total = await crud.count_authors_crud(db) if include_total else None
+    return rows, {**responses.next_cursor_headers(next_cursor), **responses.total_count_headers(total)}
+
+async def _author_row(db: AsyncSession, author_id: int) -> Tuple[dict, Dict[str, str]]:
+    row = await crud.get_author_row_crud(db, author_id=author_id)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Autor não encontrado")
+    return row, {}
+
 @router.get("/", response_model=List[pydantic_schemas.Author])
 async def read_all_authors(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: AsyncSession = Depends(deps.get_db_session)
+    after: Optional[pagination.Cursor] = Depends(deps.get_page_cursor),
+    include_total: bool = Query(False, description="Inclui os headers X-Total-Count e X-Total-Count-Exact"),
+    db: AsyncSession = Depends(get_read_db_session)
 ):
     """
     Lista todos os autores com paginação.
+    Se houver mais resultados, o header X-Next-Cursor traz o cursor para o parâmetro 'after'.
+    Com include_total=true, X-Total-Count traz o total (estimado acima de TOTAL_COUNT_EXACT_LIMIT).
     """
-    authors = await crud.get_authors_crud(db, skip=skip, limit=limit)
+    page_rows = functools.partial(
+        _authors_page_rows, db, skip=skip, limit=limit, after=after, include_total=include_total
+    )
+    if response_cache is not None:
+        return await responses.cached_json_response(request, page_rows)
+    if settings.FAST_JSON_RESPONSES:
+        rows, headers = await page_rows()
+        return responses.json_response(rows, headers=headers)
+
+    authors = await crud.get_authors_crud(db, skip=skip, limit=limit + 1, after=after)
+    authors, next_cursor = pagination.split_page(
+        authors, limit, "id", sort_value=lambda a: a.id, id_of=lambda a: a.id
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        response.headers.update(responses.total_count_headers(await crud.count_authors_crud(db)))
     return authors
 
+@router.get("/suggest", response_model=List[pydantic_schemas.AuthorSuggestion])
+async def suggest_authors(
+    prefix: str = Query(..., min_length=1, max_length=100, description="Início do nome ou de uma palavra do nome"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db_session)
+):
+    """
+    Sugestões de autores para autocomplete (ex: escolher o author_id de um material).
+    Pensado para ser chamado a cada tecla: prefixos curtos são servidos do cache do worker.
+    """
+    rows = await crud.suggest_authors_crud(db, prefix=prefix, limit=limit)
+    if settings.FAST_JSON_RESPONSES:
+        return responses.json_response(rows)
+    return rows
+
 @router.get("/{author_id}", response_model=pydantic_schemas.Author)
 async def read_single_author(
+    request: Request,
     author_id: int,
-    db: AsyncSession = Depends(deps.get_db_session)
+    db: AsyncSession = Depends(get_read_db_session)
 ):
     """
     Busca um autor pelo ID.
     """
+    if response_cache is not None:
+        return await responses.cached_json_response(request, lambda: _author_row(db, author_id=author_id))
+    if settings.FAST_JSON_RESPONSES:
+        row, headers = await _author_row(db, author_id=author_id)
+        return responses.json_response(row, headers=headers)
+
     db_author = await crud.get_author_crud(db, author_id=author_id)
     if db_author is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Autor não encontrado")
@@ -1,72 +1,276 @@
 # app/api/routers/materials.py
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import enum
+import functools
+import io
+from datetime import date, datetime
+from operator import itemgetter
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 import sqlalchemy.exc
-import asyncpg 
 
 from app.api import deps # Importa as dependências
+from app.api.routing import DBSessionRoute
+from app.api import responses
+from app.core.config import settings
+from app.core.response_cache import response_cache
+from app.db.database import get_read_db_session, get_read_sessionmaker
 from app.crud import crud # Importa os módulos
-from app.models import models as orm_models
+from app.crud import pagination
 from app.schemas import schemas as pydantic_schemas
 
-router = APIRouter()
+router = APIRouter(route_class=DBSessionRoute)
 
 @router.post("/", response_model=pydantic_schemas.Material, status_code=status.HTTP_201_CREATED)
 async def create_new_material(
     material_in: pydantic_schemas.MaterialCreate,
     db: AsyncSession = Depends(deps.get_db_session),
-    current_user: orm_models.UserOrm = Depends(deps.get_current_user) # Usuário logado será o uploader
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_user) # Usuário logado será o uploader
 ):
     """
     Cria um novo material. Requer autenticação.
     O usuário autenticado será definido como o 'uploader'.
     """
-    # Verifica se o autor existe
-    author = await crud.get_author_crud(db, author_id=material_in.author_id)
-    if not author:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Autor com ID {material_in.author_id} não encontrado"
-        )
-    
     try:
         created_material = await crud.create_material_crud(db=db, material=material_in, uploader_id=current_user.id)
         return created_material
     except sqlalchemy.exc.IntegrityError as e:
-        if isinstance(e.orig, asyncpg.exceptions.UniqueViolationError):
-            if "materials_isbn_key" in str(e.orig).lower() or (e.orig.constraint_name and "isbn" in e.orig.constraint_name.lower()):
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="Um material com este ISBN já existe."
-                )
-            elif "materials_doi_key" in str(e.orig).lower() or (e.orig.constraint_name and "doi" in e.orig.constraint_name.lower()):
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="Um material com este DOI já existe."
-                )
+        # O autor não é buscado antes: author_id inexistente viola a chave estrangeira no INSERT
+        if crud.foreign_key_violation(e):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Autor com ID {material_in.author_id} não encontrado"
+            )
+        conflict = crud.material_conflict_detail(e)
+        if conflict:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=conflict)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Erro de integridade dos dados: {e.orig}")
+
+@router.post("/bulk", response_model=pydantic_schemas.MaterialBulkResult)
+async def create_materials_bulk(
+    materials_in: List[pydantic_schemas.MaterialCreate],
+    db: AsyncSession = Depends(deps.get_db_session),
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_user) # Usuário logado será o uploader
+):
+    """
+    Cria vários materiais em uma única transação. Requer autenticação.
+    Todos os autores são validados com uma query e os itens são inseridos com um INSERT de várias linhas.
+    O resultado traz um status por item (created, conflict de ISBN/DOI ou author_not_found).
+    """
+    if len(materials_in) > settings.MATERIALS_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {settings.MATERIALS_BULK_MAX_ITEMS} materiais por lote"
+        )
+    try:
+        return await crud.create_materials_bulk_crud(db=db, materials=materials_in, uploader_id=current_user.id)
+    except sqlalchemy.exc.IntegrityError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Erro de integridade dos dados: {e.orig}")
 
+def _check_cursor_sort(after: Optional[pagination.Cursor], sort: pydantic_schemas.MaterialSortEnum) -> None:
+    # O cursor guarda o valor da coluna de ordenação: só vale para a ordenação que o gerou
+    if after is not None and after.sort_key != sort.value:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor 'after' gerado para outra ordenação"
+        )
+
+async def _materials_page_rows(
+    db: AsyncSession,
+    skip: int,
+    limit: int,
+    after: Optional[pagination.Cursor],
+    filters: pydantic_schemas.MaterialFilters,
+    sort: pydantic_schemas.MaterialSortEnum,
+    include_total: bool,
+) -> Tuple[List[dict], Dict[str, str]]:
+    # Leitura por linhas (FAST_JSON_RESPONSES e cache de respostas); busca um item a mais
+    # só para saber se existe uma próxima página
+    rows = await crud.get_materials_rows_crud(
+        db, skip=skip, limit=limit + 1, after=after, filters=filters, sort=sort
+    )
+    rows, next_cursor = pagination.split_page(
+        rows, limit, sort.value, sort_value=itemgetter(crud.material_sort_field(sort)), id_of=itemgetter("id")
+    )
+    total = await crud.count_materials_crud(db, filters=filters) if include_total else None
+    return rows, {**responses.next_cursor_headers(next_cursor), **responses.total_count_headers(total)}
+
+async def _material_row(db: AsyncSession, material_id: int) -> Tuple[dict, Dict[str, str]]:
+    row = await crud.get_material_row_crud(db, material_id=material_id)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Material não encontrado")
+    return row, {}
+
 @router.get("/", response_model=List[pydantic_schemas.Material])
 async def read_all_materials(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: AsyncSession = Depends(deps.get_db_session)
+    after: Optional[pagination.Cursor] = Depends(deps.get_page_cursor),
+    filters: pydantic_schemas.MaterialFilters = Depends(deps.get_material_filters),
+    sort: pydantic_schemas.MaterialSortEnum = Query(
+        pydantic_schemas.MaterialSortEnum.id, description="Campo de ordenação; prefixo '-' para decrescente"
+    ),
+    include_total: bool = Query(False, description="Inclui os headers X-Total-Count e X-Total-Count-Exact"),
+    db: AsyncSession = Depends(get_read_db_session)
 ):
     """
-    Lista todos os materiais com paginação.
+    Lista todos os materiais com paginação, filtros opcionais e ordenação.
+    Se houver mais resultados, o header X-Next-Cursor traz o cursor para o parâmetro 'after',
+    que busca a próxima página com o mesmo custo da primeira (skip continua funcionando).
+    O cursor só vale com a mesma ordenação; os filtros devem ser repetidos a cada página.
+    Com include_total=true, X-Total-Count traz o total dos filtros: exato até TOTAL_COUNT_EXACT_LIMIT,
+    estimado acima disso (X-Total-Count-Exact: false).
     """
-    materials = await crud.get_materials_crud(db, skip=skip, limit=limit)
+    _check_cursor_sort(after, sort)
+    page_rows = functools.partial(
+        _materials_page_rows, db, skip=skip, limit=limit, after=after, filters=filters, sort=sort,
+        include_total=include_total,
+    )
+    if response_cache is not None:
+        return await responses.cached_json_response(request, page_rows)
+    if settings.FAST_JSON_RESPONSES:
+        rows, headers = await page_rows()
+        return responses.json_response(rows, headers=headers)
+
+    # Busca um item a mais só para saber se existe uma próxima página
+    materials = await crud.get_materials_crud(
+        db, skip=skip, limit=limit + 1, after=after, filters=filters, sort=sort
+    )
+    sort_field = crud.material_sort_field(sort)
+    materials, next_cursor = pagination.split_page(
+        materials, limit, sort.value, sort_value=lambda m: getattr(m, sort_field), id_of=lambda m: m.id
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        response.headers.update(responses.total_count_headers(await crud.count_materials_crud(db, filters=filters)))
     return materials
 
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+async def _export_chunks(
+    export_format: pydantic_schemas.ExportFormatEnum,
+    filters: pydantic_schemas.MaterialFilters,
+    since: Optional[datetime],
+) -> AsyncIterator[bytes]:
+    if export_format == pydantic_schemas.ExportFormatEnum.csv:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([header for header, _ in crud.MATERIAL_ROW_FIELDS])
+        # O cabeçalho sai antes da primeira query terminar
+        yield buffer.getvalue().encode()
+
+    # A sessão é aberta dentro do gerador: ela precisa viver enquanto a resposta é transmitida,
+    # e não só até o fim do handler, como a de get_db_session. Como toda leitura, vai para a réplica.
+    session_factory = await get_read_sessionmaker()
+    async with session_factory() as db:
+        async for rows in crud.stream_materials_rows_crud(
+            db, filters=filters, since=since, chunk_size=settings.EXPORT_CHUNK_SIZE
+        ):
+            if export_format == pydantic_schemas.ExportFormatEnum.csv:
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(
+                    [_csv_value(row[key]) for _, key in crud.MATERIAL_ROW_FIELDS] for row in rows
+                )
+                yield buffer.getvalue().encode()
+            else:
+                yield b"".join(
+                    orjson.dumps(crud.nest_author(row), option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE)
+                    for row in rows
+                )
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+async def export_materials(
+    format: pydantic_schemas.ExportFormatEnum = pydantic_schemas.ExportFormatEnum.ndjson,
+    filters: pydantic_schemas.MaterialFilters = Depends(deps.get_material_filters),
+    since: Optional[datetime] = Query(None, description="Apenas materiais criados/alterados a partir desta data"),
+):
+    """
+    Exporta o catálogo completo de materiais (com o autor) em NDJSON ou CSV, em streaming.
+    Usa um cursor do lado do servidor: a memória fica constante e o primeiro byte sai logo,
+    qualquer que seja o tamanho da tabela. Aceita os mesmos filtros da listagem.
+    """
+    if format == pydantic_schemas.ExportFormatEnum.csv:
+        media_type, extension = "text/csv", "csv"
+    else:
+        media_type, extension = "application/x-ndjson", "ndjson"
+    return StreamingResponse(
+        _export_chunks(format, filters, since),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="materials.{extension}"'},
+    )
+
+async def _search_page_rows(
+    db: AsyncSession,
+    q: str,
+    limit: int,
+    after: Optional[pagination.Cursor],
+    filters: pydantic_schemas.MaterialFilters,
+) -> Tuple[List[dict], Dict[str, str]]:
+    rows = await crud.search_materials_rows_crud(db, q=q, limit=limit + 1, after=after, filters=filters)
+    rows, next_cursor = pagination.split_page(
+        rows, limit, "rank", sort_value=itemgetter("rank"), id_of=itemgetter("id")
+    )
+    return rows, responses.next_cursor_headers(next_cursor)
+
+@router.get("/search", response_model=List[pydantic_schemas.MaterialSearchHit])
+async def search_materials(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description='Termos de busca ("frase", OR, -termo)'),
+    limit: int = Query(10, ge=1, le=100),
+    after: Optional[pagination.Cursor] = Depends(deps.get_page_cursor),
+    filters: pydantic_schemas.MaterialFilters = Depends(deps.get_material_filters),
+    db: AsyncSession = Depends(get_read_db_session)
+):
+    """
+    Busca textual em título, revista, descrição e nome do autor, ordenada por relevância.
+    Cada resultado traz o rank e os trechos com os termos destacados (<mark>).
+    A próxima página vem pelo header X-Next-Cursor (repita q e os filtros).
+    """
+    if after is not None and after.sort_key != "rank":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor 'after' não é de uma busca")
+    if response_cache is not None:
+        return await responses.cached_json_response(
+            request, lambda: _search_page_rows(db, q=q, limit=limit, after=after, filters=filters)
+        )
+    rows, headers = await _search_page_rows(db, q=q, limit=limit, after=after, filters=filters)
+    if settings.FAST_JSON_RESPONSES:
+        return responses.json_response(rows, headers=headers)
+    response.headers.update(headers)
+    return rows
+
 @router.get("/{material_id}", response_model=pydantic_schemas.Material)
 async def read_single_material(
+    request: Request,
     material_id: int,
-    db: AsyncSession = Depends(deps.get_db_session)
+    db: AsyncSession = Depends(get_read_db_session)
 ):
     """
     Busca um material pelo ID.
     """
+    if response_cache is not None:
+        return await responses.cached_json_response(request, lambda: _material_row(db, material_id=material_id))
+    if settings.FAST_JSON_RESPONSES:
+        row, headers = await _material_row(db, material_id=material_id)
+        return responses.json_response(row, headers=headers)
+
     db_material = await crud.get_material_crud(db, material_id=material_id)
     if db_material is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Material não encontrado")
@@ -77,36 +281,36 @@ async def update_existing_material(
     material_id: int,
     material_in: pydantic_schemas.MaterialUpdate,
     db: AsyncSession = Depends(deps.get_db_session),
-    current_user: orm_models.UserOrm = Depends(deps.get_current_user) # Ou superuser, dependendo da regra
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_user) # Ou superuser, dependendo da regra
 ):
     """
     Atualiza um material existente.
     """
-    db_material = await crud.get_material_crud(db, material_id=material_id)
-    if not db_material:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Material não encontrado")
-
     # Opcional: Verificar permissão (ex: só o uploader ou superuser pode editar)
-    # if db_material.uploader_id != current_user.id and not current_user.is_superuser:
-    #     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não tem permissão para editar este material")
+    # -> filtrar também por uploader_id == current_user.id no UPDATE de update_material_crud
 
-    # Verifica se o novo author_id (se fornecido) existe
-    if material_in.author_id is not None:
-        author = await crud.get_author_crud(db, author_id=material_in.author_id)
-        if not author:
+    try:
+        updated_material = await crud.update_material_crud(db=db, material_id=material_id, material_in=material_in)
+    except sqlalchemy.exc.IntegrityError as e:
+        # Um novo author_id inexistente viola a chave estrangeira no próprio UPDATE
+        if crud.foreign_key_violation(e):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Autor com ID {material_in.author_id} não encontrado para atualização"
             )
-
-    updated_material = await crud.update_material_crud(db=db, material_db_obj=db_material, material_in=material_in)
+        conflict = crud.material_conflict_detail(e)
+        if conflict:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=conflict)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Erro de integridade dos dados: {e.orig}")
+    if updated_material is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Material não encontrado")
     return updated_material
 
 @router.delete("/{material_id}", response_model=pydantic_schemas.Material) # Ou status_code=204 e sem response_model
 async def delete_existing_material(
     material_id: int,
     db: AsyncSession = Depends(deps.get_db_session),
-    current_user: orm_models.UserOrm = Depends(deps.get_current_active_superuser) # só superuser pode deletar
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_active_superuser) # só superuser pode deletar
 ):
     """
     Deleta um material. (Exemplo: protegido para superusuários)
@@ -2,14 +2,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 import sqlalchemy.exc
-import asyncpg
 
 from app.crud import crud # Importa os módulos
-from app.models import models as orm_models
 from app.schemas import schemas as pydantic_schemas
 from app.api import deps # Importa as dependências
+from app.api.routing import DBSessionRoute
+from app.api import responses
+from app.core.config import settings
+from app.db.database import get_read_db_session
 
-router = APIRouter()
+router = APIRouter(route_class=DBSessionRoute)
 
 @router.post("/", response_model=pydantic_schemas.User, status_code=status.HTTP_201_CREATED)
 async def register_user(
@@ -18,47 +20,69 @@ async def register_user(
 ):
     """
     Registra um novo usuário.
+    Username ou email já registrados retornam 409 (detectados pelo índice único no INSERT).
     """
-    db_user_by_username = await crud.get_user_by_username(db, username=user_in.username)
-    if db_user_by_username:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username já registrado")
-    db_user_by_email = await crud.get_user_by_email(db, email=user_in.email)
-    if db_user_by_email:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email já registrado")
-
     try:
         created_user = await crud.create_user(db=db, user=user_in)
         return created_user
     except sqlalchemy.exc.IntegrityError as e:
-        if isinstance(e.orig, asyncpg.exceptions.UniqueViolationError):
-            if "users_username_key" in str(e.orig).lower() or (e.orig.constraint_name and "username" in e.orig.constraint_name.lower()):
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT, detail="Este nome de usuário já existe."
-                )
-            elif "users_email_key" in str(e.orig).lower() or (e.orig.constraint_name and "email" in e.orig.constraint_name.lower()):
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT, detail="Este email já está registrado."
-                )
+        conflict = crud.user_conflict_detail(e)
+        if conflict:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=conflict)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Erro de integridade dos dados ao criar usuário: {e.orig}")
 
 @router.get("/me", response_model=pydantic_schemas.User)
 async def read_users_me(
-    current_user: orm_models.UserOrm = Depends(deps.get_current_user)
+    db: AsyncSession = Depends(deps.get_db_session),
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_user)
 ):
     """
     Retorna os dados do usuário autenticado.
     """
-    return current_user
+    # get_current_user só traz id/username/flags (possivelmente do cache); os demais campos vêm do banco
+    if settings.FAST_JSON_RESPONSES:
+        user_row = await crud.get_user_row_crud(db, user_id=current_user.id)
+        if user_row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
+        return responses.json_response(user_row)
+    db_user = await crud.get_user(db, user_id=current_user.id)
+    if db_user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
+    return db_user
 
 @router.get("/", response_model=list[pydantic_schemas.User])
 async def read_all_users(
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(deps.get_db_session),
-    current_user: orm_models.UserOrm = Depends(deps.get_current_active_superuser) # Protegido
+    db: AsyncSession = Depends(get_read_db_session),
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_active_superuser) # Protegido
 ):
     """
     Lista todos os usuários (apenas para superusuários).
     """
-    users = await crud.get_users(db, skip=skip, limit=limit) # Precisaria de um crud.get_users
+    if settings.FAST_JSON_RESPONSES:
+        return responses.json_response(await crud.get_users_rows_crud(db, skip=skip, limit=limit))
+    users = await crud.get_users(db, skip=skip, limit=limit)
     return users
+
+@router.patch("/{user_id}", response_model=pydantic_schemas.User)
+async def update_existing_user(
+    user_id: int,
+    user_in: pydantic_schemas.UserUpdate,
+    db: AsyncSession = Depends(deps.get_db_session),
+    current_user: pydantic_schemas.Principal = Depends(deps.get_current_active_superuser) # Protegido
+):
+    """
+    Atualiza email, senha ou flags (is_active, is_superuser) de um usuário (apenas para superusuários).
+    Email já usado por outro usuário retorna 409.
+    """
+    db_user = await crud.get_user(db, user_id=user_id)
+    if db_user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
+    try:
+        return await crud.update_user(db=db, db_user=db_user, user_in=user_in)
+    except sqlalchemy.exc.IntegrityError as e:
+        conflict = crud.user_conflict_detail(e)
+        if conflict:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=conflict)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Erro de integridade dos dados ao atualizar usuário: {e.orig}")
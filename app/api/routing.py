@@ -0,0 +1,31 @@
+# app/api/routing.py
+import functools
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _release_sessions(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(endpoint) # mantém a assinatura: o FastAPI continua injetando as mesmas dependências
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            for value in kwargs.values():
+                if isinstance(value, AsyncSession):
+                    await value.close()
+    return wrapper
+
+
+class DBSessionRoute(APIRoute):
+    """
+    Rota que fecha as sessões do banco recebidas pelo endpoint assim que ele retorna.
+    Sem isso a conexão fica presa até o fim da dependência com yield, ou seja, depois da
+    serialização pelo response_model e do envio da resposta ao cliente (que pode ser lento).
+    Os objetos ORM retornados continuam legíveis (expire_on_commit=False), mas atributos
+    não carregados não podem mais ser buscados, exatamente como já acontece com a AsyncSession.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, _release_sessions(endpoint), **kwargs)
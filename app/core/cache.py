@@ -0,0 +1,205 @@
+# app/core/cache.py
+import asyncio
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """
+    Cache em memória com expiração (TTL) e limite de tamanho (LRU), com contadores de acertos.
+    Pensado para ser usado a partir do event loop de um único worker (não é thread-safe).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict() # chave -> (expira_em, valor)
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING or entry[0] <= time.monotonic():
+            if entry is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if self.maxsize <= 0 or ttl <= 0: # cache desabilitado
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# --- Backends de cache compartilhado (respostas do catálogo) ---
+
+class CacheBackendError(Exception):
+    """Falha de comunicação com o backend de cache (tratada como cache miss pelos chamadores)."""
+
+
+class CacheBackend:
+    """Interface mínima de um backend de cache de bytes."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Backend em memória do próprio worker (LRU com TTL); não é compartilhado entre workers."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.entries: TTLCache[bytes] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        counter = self._counters.get(key)
+        if counter is not None:
+            return str(counter).encode()
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.entries.set(key, value, ttl=ttl)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cliente mínimo do protocolo Redis (RESP2) sobre asyncio, com os comandos usados pelo cache
+    (GET, SET EX, INCR). Funciona com Redis, Valkey, KeyDB ou qualquer serviço compatível.
+    URL no formato redis://[:senha@]host[:porta][/db].
+    Conexão e cada comando têm o prazo timeout (segundos): um servidor travado vira CacheBackendError
+    (cache miss para os chamadores) em vez de segurar a requisição.
+    """
+
+    def __init__(self, url: str, max_idle_connections: int = 8, timeout: float = 0.25):
+        parsed = urllib.parse.urlsplit(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = urllib.parse.unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.max_idle_connections = max_idle_connections
+        self.timeout = timeout
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.execute("SET", key, value, "EX", ttl)
+
+    async def incr(self, key: str) -> int:
+        return await self.execute("INCR", key)
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    async def execute(self, *args: Any) -> Any:
+        try:
+            connection = self._idle.pop() if self._idle else await asyncio.wait_for(self._connect(), self.timeout)
+            try:
+                reply = await asyncio.wait_for(self._call(connection, args), self.timeout)
+            except BaseException:
+                connection[1].close() # conexão em estado desconhecido (ex: resposta pela metade)
+                raise
+        except asyncio.TimeoutError as e:
+            raise CacheBackendError(
+                f"Cache em {self.host}:{self.port} não respondeu em {self.timeout * 1000:.0f} ms"
+            ) from e
+        except (OSError, EOFError) as e:
+            raise CacheBackendError(f"Falha ao acessar o cache em {self.host}:{self.port}: {e}") from e
+        if len(self._idle) < self.max_idle_connections:
+            self._idle.append(connection)
+        else:
+            connection[1].close()
+        return reply
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        connection = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._call(connection, ("AUTH", self.password))
+        if self.db:
+            await self._call(connection, ("SELECT", self.db))
+        return connection
+
+    async def _call(self, connection: Tuple[asyncio.StreamReader, asyncio.StreamWriter], args: tuple) -> Any:
+        reader, writer = connection
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        writer.write(b"".join(parts))
+        await writer.drain()
+        return await self._read_reply(reader)
+
+    async def _read_reply(self, reader: asyncio.StreamReader) -> Any:
+        line = await reader.readuntil(b"\r\n")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise CacheBackendError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            return (await reader.readexactly(length + 2))[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [await self._read_reply(reader) for _ in range(length)]
+        raise CacheBackendError(f"Resposta inesperada do cache: {line!r}")
+
+
+def create_cache_backend(url: str, maxsize: int, ttl: int, timeout: float = 0.25) -> CacheBackend:
+    """'memory' -> MemoryCacheBackend; 'redis://...' -> RedisCacheBackend."""
+    if url == "memory":
+        return MemoryCacheBackend(maxsize=maxsize, ttl=ttl)
+    if url.startswith("redis://"):
+        return RedisCacheBackend(url, timeout=timeout)
+    raise ValueError(f"Backend de cache não suportado: {url!r} (use 'memory' ou 'redis://...')")
@@ -1,4 +1,6 @@
 # Exemplo de app/core/config.py
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,7 +9,93 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     DATABASE_URL: str
+
+    # Servidor de produção (python -m app.server). SERVER_WORKERS=0 usa um worker por CPU disponível;
+    # cada worker tem o próprio pool, então o total de conexões é workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_LOOP: str = "uvloop"
+    SERVER_HTTP: str = "httptools"
+    SERVER_BACKLOG: int = 2048 # conexões aguardando accept() durante picos
+    # Maior que o idle timeout do balanceador (ex: 60s no ALB): quem fecha a conexão ociosa é ele,
+    # evitando o 502 de reaproveitar uma conexão que o worker acabou de fechar
+    SERVER_KEEPALIVE_SECONDS: int = 75
+    # No SIGTERM, para de aceitar conexões e espera as requisições em andamento até este prazo
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+
+    # Pool de conexões do SQLAlchemy (por worker: o total no Postgres é workers x (size + overflow))
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0 # segundos esperando uma conexão livre antes de falhar
+    DB_POOL_RECYCLE: int = 1800 # segundos; -1 nunca recicla
+    DB_POOL_PRE_PING: bool = True # testa a conexão no checkout (descarta conexões mortas)
+    DB_STATEMENT_CACHE_SIZE: int = 100 # prepared statements em cache por conexão (asyncpg)
+    # true quando o app conecta por um pooler em modo transação (ex: PgBouncer): desliga o cache
+    # de prepared statements, que não sobrevive à troca de conexão do servidor entre transações
+    DB_TRANSACTION_POOLING: bool = False
+    # Cria as tabelas que faltam no startup da API. python -m app.server desliga nos workers:
+    # o processo principal cria as tabelas uma vez, antes de iniciá-los
+    DB_CREATE_TABLES_ON_STARTUP: bool = True
+    DB_ECHO: bool = False # loga todas as queries (pela fila de logs; só para depurar em desenvolvimento)
+    # Logs (app/core/logging_config.py): "json" (uma linha por registro) ou "text"; a fila é escrita
+    # por uma thread e descarta registros quando enche. LOG_SAMPLE_RATE é a fração mantida dos
+    # registros INFO/DEBUG de alto volume (access log por requisição e SQL do DB_ECHO).
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATE: float = 1.0
+    # "production" desliga recursos de diagnóstico caros (ex: EXPLAIN ANALYZE das queries lentas)
+    ENVIRONMENT: str = "development"
+    # Registro de queries lentas (por worker): log e ranking das SLOW_QUERY_TOP_N queries mais lentas,
+    # agrupadas por SQL normalizado, em GET /api/v1/admin/slow-queries
+    SLOW_QUERY_LOG: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_TOP_N: int = 50
+
+    # Réplica de leitura opcional: GETs REST e queries GraphQL vão para ela enquanto o atraso de
+    # replicação estiver dentro de REPLICA_MAX_LAG_SECONDS; escritas e autenticação ficam na primária
+    READ_DATABASE_URL: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL: float = 1.0 # segundos entre medições do atraso
+
+    # Serialização rápida das rotas de leitura REST: linhas do Core -> orjson -> bytes,
+    # sem ORM nem validação Pydantic da resposta (o schema do OpenAPI continua o mesmo)
+    FAST_JSON_RESPONSES: bool = False
+    # Linhas buscadas por vez pelo cursor do servidor em GET /materials/export
+    EXPORT_CHUNK_SIZE: int = 1000
+    # Tamanho máximo de um lote em POST /materials/bulk e na mutation createMaterials
+    MATERIALS_BULK_MAX_ITEMS: int = 1000
+    # Total das listagens (include_total / totalCount): contado de verdade até este número de linhas,
+    # acima dele estimado pelo planejador do Postgres (EXPLAIN), sem percorrer a tabela
+    TOTAL_COUNT_EXACT_LIMIT: int = 10000
+    # Busca textual: máximo de candidatos (por índice GIN) ordenados por ts_rank em cada busca.
+    # Limita o custo de termos muito comuns; buscas mais seletivas que isso têm ranking exato.
+    # Acima do limite só os materiais mais recentes (maior id) que casam com a busca são ordenados.
+    SEARCH_MAX_CANDIDATES: int = 2000
     
+    # Threads dedicadas ao bcrypt (limite de hashes/verificações simultâneos por worker)
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Cache do usuário autenticado por token (get_current_user). É por worker: alterações feitas
+    # em outro worker só são vistas depois do TTL. PRINCIPAL_CACHE_TTL_SECONDS=0 desabilita.
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    # Sugestões de autores (GET /authors/suggest): cache por worker dos prefixos de até
+    # AUTHOR_SUGGEST_CACHE_MAX_PREFIX caracteres, os mais digitados e os que casam com mais autores.
+    # Um autor criado limpa o cache do worker que o criou; nos demais aparece depois do TTL.
+    AUTHOR_SUGGEST_CACHE_SIZE: int = 512
+    AUTHOR_SUGGEST_CACHE_TTL_SECONDS: int = 60
+    AUTHOR_SUGGEST_CACHE_MAX_PREFIX: int = 3
+
+    # Cache das leituras do catálogo (REST e GraphQL): None desliga, "memory" usa um LRU por worker
+    # e "redis://host:porta/db" usa um servidor compatível com Redis, compartilhado entre os workers.
+    # Escritas pela API invalidam o cache; importações direto no banco só aparecem após o TTL.
+    RESPONSE_CACHE_BACKEND: Optional[str] = None
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    RESPONSE_CACHE_SIZE: int = 1024
+    RESPONSE_CACHE_TIMEOUT: float = 0.25 # segundos por operação no Redis; estourou, vale como cache miss
+
     # Para carregar do .env automaticamente
     model_config = SettingsConfigDict(env_file=".env", extra='ignore')
 
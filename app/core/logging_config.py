@@ -0,0 +1,230 @@
+# app/core/logging_config.py
+"""
+Logging estruturado e não bloqueante, configurado uma vez no startup (configure_logging).
+
+Os loggers só colocam o registro em uma fila limitada (LOG_QUEUE_SIZE); uma thread em segundo plano
+formata (JSON, uma linha por registro) e escreve no stdout. Se o coletor de logs não acompanhar, a fila
+enche e os registros novos são descartados (métrica log_records_dropped) em vez de travar o event loop.
+Registros feitos durante uma requisição levam request_id, route e user_id; ao fim de cada requisição o
+logger app.access registra status, duração e queries. Registros abaixo de WARNING dos loggers de alto
+volume (app.access e o SQL do SQLAlchemy) passam pela amostragem de LOG_SAMPLE_RATE.
+"""
+import copy
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+import orjson
+
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.core.request_metrics import current_request_db_stats, current_route
+
+ACCESS_LOGGER = "app.access"
+HIGH_VOLUME_LOGGERS = (ACCESS_LOGGER, "sqlalchemy.engine")
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+LOG_RECORDS_DROPPED = Counter("log_records_dropped", "Registros de log descartados com a fila de logs cheia")
+
+access_logger = logging.getLogger(ACCESS_LOGGER)
+
+# Atributos padrão de um LogRecord: os demais (extra=...) viram campos do JSON.
+# color_message é a cópia com cores ANSI que o Uvicorn anexa às próprias mensagens.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "color_message"
+}
+_EXCEPTION_FORMATTER = logging.Formatter()
+_MAX_REQUEST_ID_LENGTH = 128
+
+
+@dataclass
+class RequestLogContext:
+    request_id: str
+    user_id: Optional[int] = None
+
+
+_request_log_context: ContextVar[Optional[RequestLogContext]] = ContextVar("request_log_context", default=None)
+
+
+def set_request_user(user_id: int) -> None:
+    """Associa o usuário autenticado aos logs do restante da requisição atual."""
+    context = _request_log_context.get()
+    if context is not None:
+        context.user_id = user_id
+
+
+class SamplingFilter(logging.Filter):
+    """Mantém só uma fração (rate) dos registros abaixo de WARNING dos loggers de alto volume."""
+
+    def __init__(self, rate: float, loggers=HIGH_VOLUME_LOGGERS):
+        super().__init__()
+        self.rate = rate
+        self.loggers = tuple(loggers)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno >= logging.WARNING or not record.name.startswith(self.loggers):
+            return True
+        return random.random() < self.rate
+
+
+class RequestContextFilter(logging.Filter):
+    """Copia os dados da requisição atual para o registro (na thread que loga: a do listener não os enxerga)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_log_context.get()
+        if context is not None:
+            record.request_id = context.request_id
+            record.route = current_route()
+            record.user_id = context.user_id
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que descarta o registro (e conta) em vez de esperar quando a fila está cheia."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve a mensagem e o traceback agora: os argumentos podem mudar até o listener formatar.
+        # Diferente do QueueHandler padrão, não formata: o formatter da saída é que monta a linha.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Um objeto JSON por linha: timestamp, level, logger, message, campos da requisição e extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return orjson.dumps(entry, default=str).decode()
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging() -> None:
+    """
+    Substitui os handlers do processo (inclusive os do Uvicorn, que escrevem de forma síncrona)
+    pela fila + thread de escrita. O SQL só é logado com DB_ECHO=true.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATE))
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    # O access log do Uvicorn é substituído pelo app.access (com rota, duração e request_id)
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if settings.DB_ECHO else logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Escreve o que ainda está na fila e para a thread de escrita (no shutdown). Os últimos registros
+    do processo (ex: o fim do shutdown do Uvicorn) vão direto para a saída, no mesmo formato.
+    """
+    global _listener
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if isinstance(existing, NonBlockingQueueHandler):
+            root.removeHandler(existing)
+    _listener.stop()
+    for output in _listener.handlers:
+        root.addHandler(output)
+    _listener = None
+
+
+def _request_id(scope: dict) -> str:
+    # Reaproveita o X-Request-ID de um proxy/cliente, para correlacionar os logs dos dois lados
+    for name, value in scope.get("headers", ()):
+        if name == b"x-request-id":
+            request_id = value.decode("latin-1")
+            if 0 < len(request_id) <= _MAX_REQUEST_ID_LENGTH and request_id.isprintable():
+                return request_id
+    return uuid.uuid4().hex
+
+
+class RequestLoggingMiddleware:
+    """Middleware ASGI: request_id nos logs e no header X-Request-ID, e um registro app.access por requisição."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        context = RequestLogContext(_request_id(scope))
+        token = _request_log_context.set(context)
+        status_code = 500 # se a aplicação falhar antes de responder
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [*message.get("headers", ()), (b"x-request-id", context.request_id.encode("latin-1"))]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            stats = current_request_db_stats()
+            access_logger.info(
+                "%s %s %s", scope["method"], scope["path"], status_code,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "db_queries": stats.queries if stats is not None else None,
+                },
+            )
+            _request_log_context.reset(token)
@@ -0,0 +1,137 @@
+# app/core/metrics.py
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Limites (em segundos) adequados para latências de requisições e de operações de CPU como o bcrypt
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Métricas expostas em /metrics (formato texto do Prometheus), na ordem de criação
+REGISTRY: List = []
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+class Histogram:
+    """Histograma cumulativo simples (no estilo do Prometheus), seguro para uso a partir de várias threads."""
+
+    def __init__(
+        self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS, register: bool = True
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1) # o último é o +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+        if register:
+            REGISTRY.append(self)
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {"count": count, "sum": total, "buckets": buckets}
+
+    def samples(self, labels: Sequence[Tuple[str, str]] = ()) -> List[str]:
+        snapshot = self.snapshot()
+        lines = [
+            f"{self.name}_bucket{_format_labels([*labels, ('le', bound)])} {count}"
+            for bound, count in snapshot["buckets"].items()
+        ]
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(snapshot['sum'])}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {snapshot['count']}")
+        return lines
+
+    def render(self) -> str:
+        header = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        return "\n".join(header + self.samples())
+
+
+class HistogramFamily:
+    """
+    Histogramas com o mesmo nome separados por rótulos (ex: um por rota). Cada combinação de
+    valores vira uma série: os rótulos devem ter poucos valores possíveis.
+    """
+
+    def __init__(
+        self, name: str, description: str, label_names: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def labels(self, *values: str) -> Histogram:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(
+                    values, Histogram(self.name, self.description, self.buckets, register=False)
+                )
+        return child
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.samples(list(zip(self.label_names, values))))
+        return "\n".join(lines)
+
+
+class Counter:
+    """Contador monotônico seguro para uso a partir de várias threads."""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._value = 0
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def render(self) -> str:
+        # Convenção do Prometheus: contadores terminam em _total
+        return "\n".join([
+            f"# HELP {self.name}_total {self.description}",
+            f"# TYPE {self.name}_total counter",
+            f"{self.name}_total {self._value}",
+        ])
+
+
+def render_prometheus() -> str:
+    """Todas as métricas registradas deste worker no formato texto do Prometheus (versão 0.0.4)."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
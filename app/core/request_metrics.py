@@ -0,0 +1,139 @@
+# app/core/request_metrics.py
+"""
+Métricas por requisição: latência por rota (template da rota REST ou operação GraphQL) e, via
+eventos do SQLAlchemy, quantas queries cada requisição executou e quanto tempo passou no banco.
+As séries ficam em memória, por worker, e são expostas em /metrics (veja app.core.metrics).
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.metrics import Histogram, HistogramFamily
+
+_LABELS = ("method", "route", "operation")
+# Limites para a quantidade de queries por requisição
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+REQUEST_SECONDS = HistogramFamily(
+    "http_request_duration_seconds", "Latência das requisições HTTP até o fim da resposta", _LABELS + ("status",)
+)
+REQUEST_DB_QUERIES = HistogramFamily(
+    "http_request_db_queries", "Queries SQL executadas por requisição", _LABELS, buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = HistogramFamily(
+    "http_request_db_seconds", "Tempo total de execução de SQL por requisição", _LABELS
+)
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Tempo de execução de cada query SQL")
+
+# Nomes de operação GraphQL vêm do cliente: acima deste número de nomes distintos o rótulo vira "other"
+MAX_GRAPHQL_OPERATIONS = 200
+_graphql_operations = set()
+
+
+@dataclass
+class RequestDBStats:
+    scope: Optional[dict] = None
+    queries: int = 0
+    seconds: float = 0.0
+
+
+# Estatísticas da requisição atual; tasks criadas durante a requisição (ex: campos GraphQL) herdam o objeto
+_request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+
+def current_request_db_stats() -> Optional[RequestDBStats]:
+    return _request_db_stats.get()
+
+
+def current_route() -> Optional[str]:
+    """Método e rota da requisição atual (ex: "GET /api/v1/materials/"), ou None fora de uma requisição."""
+    stats = _request_db_stats.get()
+    if stats is None or stats.scope is None:
+        return None
+    route, operation = _route_labels(stats.scope)
+    return " ".join(part for part in (stats.scope["method"], route, operation) if part)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    DB_QUERY_SECONDS.observe(elapsed)
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+def instrument_engine(async_engine) -> None:
+    """Mede cada query executada pelo engine (assíncrono) e soma nas estatísticas da requisição atual."""
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def set_graphql_operation(scope: dict, operation_type: str, name: Optional[str]) -> None:
+    """Chamado pelo GraphQL: as métricas de /graphql são separadas por operação (ex: "query materialsPage")."""
+    label = f"{operation_type} {name or 'anonymous'}"
+    if label not in _graphql_operations:
+        if len(_graphql_operations) >= MAX_GRAPHQL_OPERATIONS:
+            label = f"{operation_type} other"
+        else:
+            _graphql_operations.add(label)
+    scope.setdefault("state", {})["graphql_operation"] = label
+
+
+def _route_template(scope: dict) -> str:
+    # O template (ex: /api/v1/materials/{material_id}) e não o caminho, para não criar uma série por id
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    # Conforme a versão do FastAPI, a rota de um router incluído guarda o caminho completo ou só o
+    # trecho depois do prefixo; o prefixo é a parte do caminho que a própria rota não cobre
+    path = scope["path"]
+    for i in range(len(path) + 1):
+        if (i == len(path) or path[i] == "/") and route.path_regex.match(path[i:]):
+            return path[:i] + path_format
+    return path_format
+
+
+def _route_labels(scope: dict) -> Tuple[str, str]:
+    operation = scope.get("state", {}).get("graphql_operation", "")
+    return _route_template(scope), operation
+
+
+class RequestMetricsMiddleware:
+    """Middleware ASGI: mede cada requisição HTTP, incluindo o envio de respostas em streaming."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestDBStats(scope)
+        token = _request_db_stats.set(stats)
+        status_code = 500 # se a aplicação falhar antes de responder
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db_stats.reset(token)
+            labels = (scope["method"], *_route_labels(scope))
+            REQUEST_SECONDS.labels(*labels, str(status_code)).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(*labels).observe(stats.queries)
+            REQUEST_DB_SECONDS.labels(*labels).observe(stats.seconds)
@@ -0,0 +1,71 @@
+# app/core/response_cache.py
+import logging
+from typing import Optional
+
+from app.core.cache import CacheBackend, CacheBackendError, create_cache_backend
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Cache read-through das leituras do catálogo (autores e materiais).
+    As chaves são prefixadas por uma geração; cada escrita no catálogo incrementa a geração,
+    o que invalida de uma vez todas as entradas (as antigas expiram pelo TTL).
+    Falhas do backend nunca quebram a requisição: a leitura vira cache miss.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int, namespace: str = "catalog"):
+        self.backend = backend
+        self.ttl = ttl
+        self.namespace = namespace
+        self._generation_key = f"{namespace}:generation"
+
+    async def _key(self, key: str) -> str:
+        generation = await self.backend.get(self._generation_key)
+        return f"{self.namespace}:{int(generation or 0)}:{key}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.backend.get(await self._key(key))
+        except CacheBackendError as e:
+            logger.warning("Cache de respostas indisponível na leitura: %s", e)
+            return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        try:
+            await self.backend.set(await self._key(key), value, self.ttl)
+        except CacheBackendError as e:
+            logger.warning("Cache de respostas indisponível na escrita: %s", e)
+
+    async def invalidate(self) -> None:
+        try:
+            await self.backend.incr(self._generation_key)
+        except CacheBackendError as e:
+            # Sem acesso ao backend as entradas só somem pelo TTL
+            logger.warning("Não foi possível invalidar o cache de respostas: %s", e)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+# None quando RESPONSE_CACHE_BACKEND não está configurado (cache desligado)
+response_cache: Optional[ResponseCache] = (
+    ResponseCache(
+        create_cache_backend(
+            settings.RESPONSE_CACHE_BACKEND,
+            maxsize=settings.RESPONSE_CACHE_SIZE,
+            ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+            timeout=settings.RESPONSE_CACHE_TIMEOUT,
+        ),
+        ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    )
+    if settings.RESPONSE_CACHE_BACKEND
+    else None
+)
+
+async def invalidate_catalog() -> None:
+    """Chamado pelas escritas do CRUD em autores e materiais, depois do commit."""
+    if response_cache is not None:
+        await response_cache.invalidate()
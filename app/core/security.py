@@ -1,9 +1,15 @@
 # security.py
-from typing import Optional
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
 from datetime import datetime, timedelta, timezone
 
 from jose import JWTError, jwt
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import Histogram
 from passlib.context import CryptContext
 
 # Configurações de Segurança (idealmente de variáveis de ambiente)
@@ -22,6 +28,65 @@ def get_password_hash(password: str) -> str:
     """Gera o hash de uma senha."""
     return pwd_context.hash(password)
 
+# --- Hashing fora do event loop ---
+# O bcrypt leva dezenas a centenas de ms por chamada; executado dentro de um handler async ele bloqueia
+# o event loop inteiro do worker. As versões async abaixo rodam em um pool de threads limitado
+# (o bcrypt libera o GIL, então as threads rodam em paralelo de verdade) e medem o tempo de fila.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_hash_in_flight = 0
+_hash_in_flight_lock = threading.Lock()
+HASH_QUEUE_SECONDS = Histogram(
+    "password_hash_queue_seconds", "Tempo de espera por uma thread livre do pool de hashing"
+)
+HASH_RUN_SECONDS = Histogram("password_hash_run_seconds", "Tempo de CPU de cada hash/verificação bcrypt")
+
+async def _run_in_hash_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    global _hash_in_flight
+    submitted = time.perf_counter()
+
+    def job() -> Any:
+        started = time.perf_counter()
+        HASH_QUEUE_SECONDS.observe(started - submitted)
+        try:
+            return fn(*args)
+        finally:
+            HASH_RUN_SECONDS.observe(time.perf_counter() - started)
+
+    with _hash_in_flight_lock:
+        _hash_in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, job)
+    finally:
+        with _hash_in_flight_lock:
+            _hash_in_flight -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Igual a verify_password, mas executado no pool de hashing (não bloqueia o event loop)."""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Igual a get_password_hash, mas executado no pool de hashing (não bloqueia o event loop)."""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+def password_hashing_stats() -> Dict[str, Any]:
+    """Estado do pool de hashing: limite de concorrência, operações em andamento e histogramas de fila/execução."""
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "in_flight": _hash_in_flight,
+        "queue_seconds": HASH_QUEUE_SECONDS.snapshot(),
+        "run_seconds": HASH_RUN_SECONDS.snapshot(),
+    }
+
+# --- Cache do usuário autenticado ---
+# username (subject do token) -> schemas.Principal; evita uma query por requisição autenticada
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+def invalidate_principal(username: str) -> None:
+    """Remove o usuário do cache; deve ser chamado sempre que o usuário for alterado ou desativado."""
+    principal_cache.pop(username)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Cria um novo token de acesso JWT."""
     to_encode = data.copy()
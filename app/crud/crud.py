@@ -1,12 +1,23 @@
 # app/crud/crud.py
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+import asyncpg
+import sqlalchemy.exc
+from sqlalchemy import Integer, String, any_, bindparam, cast, delete, func, insert, or_, text, union, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, load_only, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import models # Alterado para importar o módulo models
 from app.schemas import schemas # Alterado para importar o módulo schemas
-from app.core.security import get_password_hash
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.response_cache import invalidate_catalog
+from app.core.security import get_password_hash_async, invalidate_principal
+from app.crud.pagination import Cursor, keyset_condition
 
 # --- User CRUD ---
 async def get_user_by_username(db: AsyncSession, username: str) -> Optional[models.UserOrm]:
@@ -18,77 +29,590 @@ async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.Use
     return result.scalars().first()
 
 async def create_user(db: AsyncSession, user: schemas.UserCreate) -> models.UserOrm:
-    hashed_password = get_password_hash(user.password)
-    db_user = models.UserOrm(
-        username=user.username,
-        email=user.email,
-        hashed_password=hashed_password
-        # is_active e is_superuser terão seus defaults do modelo ORM
+    """
+    INSERT ... RETURNING em uma ida ao banco. Username/email duplicados não são verificados antes:
+    a violação de unicidade sobe como IntegrityError (veja user_conflict_detail), sem janela de corrida.
+    """
+    hashed_password = await get_password_hash_async(user.password)
+    statement = (
+        insert(models.UserOrm)
+        .values(
+            username=user.username,
+            email=user.email,
+            hashed_password=hashed_password
+            # is_active e is_superuser terão seus defaults do modelo ORM
+        )
+        .returning(models.UserOrm)
     )
+    try:
+        db_user = await db.scalar(statement)
+    except sqlalchemy.exc.IntegrityError:
+        await db.rollback() # deixa a sessão utilizável para quem tratar o erro
+        raise
+    await db.commit()
+    return db_user
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[models.UserOrm]:
+    result = await db.execute(select(models.UserOrm).filter(models.UserOrm.id == user_id))
+    return result.scalars().first()
+
+async def update_user(
+    db: AsyncSession, db_user: models.UserOrm, user_in: schemas.UserUpdate
+) -> models.UserOrm:
+    update_data = user_in.model_dump(exclude_unset=True)
+    password = update_data.pop("password", None)
+    if password is not None:
+        db_user.hashed_password = await get_password_hash_async(password)
+    for field, value in update_data.items():
+        setattr(db_user, field, value)
     db.add(db_user)
     await db.commit()
+    # is_active/is_superuser podem ter mudado: o próximo request do usuário relê do banco
+    invalidate_principal(db_user.username)
     await db.refresh(db_user)
     return db_user
 
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.UserOrm]:
+    result = await db.execute(select(models.UserOrm).order_by(models.UserOrm.id).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
 # --- Author CRUD ---
 async def create_author_crud(db: AsyncSession, author: schemas.AuthorCreate) -> models.AuthorOrm:
-    db_author = models.AuthorOrm(**author.model_dump())
-    db.add(db_author)
+    db_author = await db.scalar(insert(models.AuthorOrm).values(**author.model_dump()).returning(models.AuthorOrm))
     await db.commit()
-    await db.refresh(db_author)
+    await invalidate_catalog()
+    author_suggestions_cache.clear()
     return db_author
 
-async def get_authors_crud(db: AsyncSession, skip: int = 0, limit: int = 10) -> List[models.AuthorOrm]:
-    result = await db.execute(select(models.AuthorOrm).offset(skip).limit(limit))
+# Sugestões por prefixo, por worker: (prefixo normalizado, limit) -> linhas
+author_suggestions_cache: TTLCache[List[dict]] = TTLCache(
+    maxsize=settings.AUTHOR_SUGGEST_CACHE_SIZE, ttl=settings.AUTHOR_SUGGEST_CACHE_TTL_SECONDS
+)
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+async def suggest_authors_crud(db: AsyncSession, prefix: str, limit: int = 10) -> List[dict]:
+    """
+    Autores cujo nome, ou alguma palavra do nome, começa com prefix (sem diferenciar maiúsculas).
+    Quem começa com o prefixo vem primeiro, depois ordem alfabética. Os dois ILIKE usam o índice
+    de trigramas ix_authors_name_trgm; prefixos curtos, os mais caros, passam pelo cache do worker.
+    """
+    normalized = " ".join(prefix.split()).lower()
+    cacheable = len(normalized) <= settings.AUTHOR_SUGGEST_CACHE_MAX_PREFIX
+    if cacheable:
+        cached = author_suggestions_cache.get((normalized, limit))
+        if cached is not None:
+            return cached
+    pattern = _escape_like(normalized)
+    starts_with = models.AuthorOrm.name.ilike(f"{pattern}%", escape="\\")
+    word_starts_with = models.AuthorOrm.name.ilike(f"% {pattern}%", escape="\\")
+    result = await db.execute(
+        select(
+            models.AuthorOrm.id, models.AuthorOrm.name, models.AuthorOrm.city, models.AuthorOrm.author_type
+        )
+        .filter(or_(starts_with, word_starts_with))
+        .order_by(starts_with.desc(), models.AuthorOrm.name, models.AuthorOrm.id)
+        .limit(limit)
+    )
+    rows = [dict(row) for row in result.mappings()]
+    if cacheable:
+        author_suggestions_cache.set((normalized, limit), rows)
+    return rows
+
+async def get_authors_crud(
+    db: AsyncSession, skip: int = 0, limit: int = 10, after: Optional[Cursor] = None
+) -> List[models.AuthorOrm]:
+    query = select(models.AuthorOrm).order_by(models.AuthorOrm.id)
+    if after is not None:
+        # Paginação por cursor (keyset): continua a partir do último id visto, sem OFFSET
+        query = query.filter(keyset_condition(models.AuthorOrm.id, models.AuthorOrm.id, after))
+    result = await db.execute(query.offset(skip).limit(limit))
     return list(result.scalars().all())
 
 async def get_author_crud(db: AsyncSession, author_id: int) -> Optional[models.AuthorOrm]:
     result = await db.execute(select(models.AuthorOrm).filter(models.AuthorOrm.id == author_id))
     return result.scalars().first()
 
+def _id_array(name: str, ids: Sequence[int]):
+    # Um único parâmetro do tipo array: gera "= ANY($1)" em vez de um IN com um parâmetro por id
+    return any_(bindparam(name, value=list(ids), type_=ARRAY(Integer)))
+
+def _str_array(name: str, values: Sequence[str]):
+    return any_(bindparam(name, value=list(values), type_=ARRAY(String)))
+
+async def get_authors_by_ids_crud(db: AsyncSession, author_ids: Sequence[int]) -> Dict[int, models.AuthorOrm]:
+    """Busca vários autores em um único round trip, indexados pelo id."""
+    result = await db.execute(
+        select(models.AuthorOrm).filter(models.AuthorOrm.id == _id_array("author_ids", author_ids))
+    )
+    return {author.id: author for author in result.scalars().all()}
+
 # --- Material CRUD ---
-async def create_material_crud(db: AsyncSession, material: schemas.MaterialCreate, uploader_id: Optional[int] = None) -> models.MaterialOrm:
-    db_material = models.MaterialOrm(**material.model_dump(), uploader_id=uploader_id)
-    db.add(db_material)
-    await db.commit()
-    await db.refresh(db_material) 
-    # Carrega o autor associado ao material
-    await db.refresh(db_material, attribute_names=['author'])
+# As escritas de material são um único comando: o INSERT/UPDATE/DELETE ... RETURNING fica numa CTE
+# e o SELECT externo junta o autor, devolvendo a linha final com o autor em uma ida ao banco.
+# Autor inexistente e ISBN/DOI repetido sobem como IntegrityError (foreign_key_violation,
+# material_conflict_detail) em vez de serem verificados com SELECTs antes.
+
+# Colunas geradas (search_vector) não são carregadas no objeto ORM: não precisam voltar no RETURNING
+_RETURNED_MATERIAL_COLUMNS = [column for column in models.MaterialOrm.__table__.c if column.computed is None]
 
+async def _write_material_returning(db: AsyncSession, statement) -> Optional[models.MaterialOrm]:
+    changed = statement.returning(*_RETURNED_MATERIAL_COLUMNS).cte("changed_material")
+    material_alias = aliased(models.MaterialOrm, changed)
+    try:
+        result = await db.execute(
+            select(material_alias, models.AuthorOrm)
+            .join(models.AuthorOrm, models.AuthorOrm.id == material_alias.author_id)
+            .execution_options(populate_existing=True)
+        )
+    except sqlalchemy.exc.IntegrityError:
+        await db.rollback() # deixa a sessão utilizável para quem tratar o erro
+        raise
+    row = result.first()
+    if row is None:
+        await db.rollback()
+        return None
+    db_material, author = row
+    set_committed_value(db_material, "author", author)
+    await db.commit()
+    await invalidate_catalog()
     return db_material
 
-async def get_materials_crud(db: AsyncSession, skip: int = 0, limit: int = 10) -> List[models.MaterialOrm]:
-    result = await db.execute(
-        select(models.MaterialOrm)
-        .options(selectinload(models.MaterialOrm.author))
-        .order_by(models.MaterialOrm.id)
-        .offset(skip)
-        .limit(limit)
+async def create_material_crud(db: AsyncSession, material: schemas.MaterialCreate, uploader_id: Optional[int] = None) -> models.MaterialOrm:
+    return await _write_material_returning(
+        db, insert(models.MaterialOrm).values(**material.model_dump(), uploader_id=uploader_id)
     )
+
+# --- Violações de integridade ---
+MATERIAL_ISBN_CONFLICT = "Um material com este ISBN já existe."
+MATERIAL_DOI_CONFLICT = "Um material com este DOI já existe."
+USER_USERNAME_CONFLICT = "Este nome de usuário já existe."
+USER_EMAIL_CONFLICT = "Este email já está registrado."
+
+def _asyncpg_error(error: sqlalchemy.exc.IntegrityError, error_class):
+    # Com o driver assíncrono do SQLAlchemy, e.orig é o erro adaptado e a exceção do asyncpg fica em __cause__
+    for candidate in (error.orig, getattr(error.orig, "__cause__", None)):
+        if isinstance(candidate, error_class):
+            return candidate
+    return None
+
+def unique_violation(error: sqlalchemy.exc.IntegrityError) -> Optional[asyncpg.exceptions.UniqueViolationError]:
+    """Retorna a UniqueViolationError do asyncpg por trás de um IntegrityError, se for o caso."""
+    return _asyncpg_error(error, asyncpg.exceptions.UniqueViolationError)
+
+def foreign_key_violation(error: sqlalchemy.exc.IntegrityError) -> bool:
+    """True se o IntegrityError veio de uma chave estrangeira inexistente (ex: author_id)."""
+    return _asyncpg_error(error, asyncpg.exceptions.ForeignKeyViolationError) is not None
+
+def _conflict_detail(error: sqlalchemy.exc.IntegrityError, details: Dict[str, str]) -> Optional[str]:
+    # A coluna é identificada pelo nome da constraint/índice único (ex: materials_isbn_key, ix_users_email)
+    violation = unique_violation(error)
+    if violation is None:
+        return None
+    message = str(violation).lower()
+    constraint = (violation.constraint_name or "").lower()
+    for column, detail in details.items():
+        if column in constraint or f"_{column}_key" in message:
+            return detail
+    return None
+
+def material_conflict_detail(error: sqlalchemy.exc.IntegrityError) -> Optional[str]:
+    """Mensagem de conflito (ISBN/DOI) para violações de materials_isbn_key/materials_doi_key."""
+    return _conflict_detail(error, {"isbn": MATERIAL_ISBN_CONFLICT, "doi": MATERIAL_DOI_CONFLICT})
+
+def user_conflict_detail(error: sqlalchemy.exc.IntegrityError) -> Optional[str]:
+    """Mensagem de conflito para username/email já registrados."""
+    return _conflict_detail(error, {"username": USER_USERNAME_CONFLICT, "email": USER_EMAIL_CONFLICT})
+
+async def create_materials_bulk_crud(
+    db: AsyncSession, materials: Sequence[schemas.MaterialCreate], uploader_id: Optional[int] = None
+) -> schemas.MaterialBulkResult:
+    """
+    Cria vários materiais em uma transação: uma query valida todos os author_ids, outra busca
+    ISBNs/DOIs já usados, e os itens válidos entram com INSERT ... VALUES (...), (...) RETURNING id.
+    O resultado traz um item por material, na ordem recebida.
+    """
+    results: List[Optional[schemas.MaterialBulkItemResult]] = [None] * len(materials)
+
+    author_ids = {m.author_id for m in materials}
+    existing_authors = set(
+        (await db.execute(
+            select(models.AuthorOrm.id).filter(models.AuthorOrm.id == _id_array("author_ids", author_ids))
+        )).scalars()
+    )
+
+    isbns = [m.isbn for m in materials if m.isbn]
+    dois = [m.doi for m in materials if m.doi]
+    taken_isbns, taken_dois = set(), set()
+    if isbns or dois:
+        taken = await db.execute(
+            select(models.MaterialOrm.isbn, models.MaterialOrm.doi).filter(
+                or_(models.MaterialOrm.isbn == _str_array("isbns", isbns),
+                    models.MaterialOrm.doi == _str_array("dois", dois))
+            )
+        )
+        for isbn, doi in taken:
+            taken_isbns.add(isbn)
+            taken_dois.add(doi)
+
+    pending = [] # (índice, valores) dos itens que podem ser inseridos
+    for index, material in enumerate(materials):
+        if material.author_id not in existing_authors:
+            results[index] = schemas.MaterialBulkItemResult(
+                index=index, status=schemas.BulkItemStatusEnum.author_not_found,
+                detail=f"Autor com ID {material.author_id} não encontrado"
+            )
+        elif material.isbn and material.isbn in taken_isbns:
+            results[index] = schemas.MaterialBulkItemResult(
+                index=index, status=schemas.BulkItemStatusEnum.conflict, detail=MATERIAL_ISBN_CONFLICT
+            )
+        elif material.doi and material.doi in taken_dois:
+            results[index] = schemas.MaterialBulkItemResult(
+                index=index, status=schemas.BulkItemStatusEnum.conflict, detail=MATERIAL_DOI_CONFLICT
+            )
+        else:
+            # Repetições dentro do próprio lote também são conflitos
+            if material.isbn:
+                taken_isbns.add(material.isbn)
+            if material.doi:
+                taken_dois.add(material.doi)
+            pending.append((index, {**material.model_dump(), "uploader_id": uploader_id}))
+
+    if pending:
+        try:
+            async with db.begin_nested():
+                inserted = await db.execute(
+                    insert(models.MaterialOrm).returning(models.MaterialOrm.id, sort_by_parameter_order=True),
+                    [values for _, values in pending],
+                )
+                for (index, _), material_id in zip(pending, inserted.scalars()):
+                    results[index] = schemas.MaterialBulkItemResult(
+                        index=index, status=schemas.BulkItemStatusEnum.created, id=material_id
+                    )
+        except sqlalchemy.exc.IntegrityError:
+            # Outra transação gravou um ISBN/DOI entre a verificação e o INSERT: refaz item a item
+            for index, values in pending:
+                try:
+                    async with db.begin_nested():
+                        inserted = await db.execute(
+                            insert(models.MaterialOrm).values(**values).returning(models.MaterialOrm.id)
+                        )
+                        results[index] = schemas.MaterialBulkItemResult(
+                            index=index, status=schemas.BulkItemStatusEnum.created, id=inserted.scalar_one()
+                        )
+                except sqlalchemy.exc.IntegrityError as e:
+                    detail = material_conflict_detail(e)
+                    if detail is None:
+                        raise
+                    results[index] = schemas.MaterialBulkItemResult(
+                        index=index, status=schemas.BulkItemStatusEnum.conflict, detail=detail
+                    )
+
+    await db.commit()
+    await invalidate_catalog()
+    created = sum(1 for r in results if r.status == schemas.BulkItemStatusEnum.created)
+    return schemas.MaterialBulkResult(created=created, failed=len(results) - created, results=results)
+
+def _material_load_options(load_author: bool, only: Optional[Sequence[str]]) -> list:
+    options = []
+    if load_author:
+        options.append(selectinload(models.MaterialOrm.author))
+    if only is not None:
+        # Projeção: carrega só as colunas pedidas (as demais ficam não carregadas no objeto ORM)
+        options.append(load_only(*(getattr(models.MaterialOrm, name) for name in only)))
+    return options
+
+# --- Totais das listagens ---
+async def _count_crud(db: AsyncSession, query) -> schemas.TotalCount:
+    """
+    Total de linhas de query (um SELECT sem ORDER BY/LIMIT). O COUNT para em
+    TOTAL_COUNT_EXACT_LIMIT + 1 linhas: até o limite o total é exato, acima dele vale a
+    estimativa do planejador (EXPLAIN, a partir das estatísticas da tabela), sem percorrê-la.
+    """
+    exact_limit = settings.TOTAL_COUNT_EXACT_LIMIT
+    bounded = await db.scalar(select(func.count()).select_from(query.limit(exact_limit + 1).subquery()))
+    if bounded <= exact_limit:
+        return schemas.TotalCount(count=bounded, exact=True)
+    # Os filtros são só enums, inteiros e datas: seguros para renderizar como literais
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    plan = await db.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    return schemas.TotalCount(count=max(int(plan[0]["Plan"]["Plan Rows"]), bounded), exact=False)
+
+async def count_materials_crud(
+    db: AsyncSession, filters: Optional[schemas.MaterialFilters] = None
+) -> schemas.TotalCount:
+    return await _count_crud(db, _filter_materials(select(models.MaterialOrm.id), filters))
+
+async def count_authors_crud(db: AsyncSession) -> schemas.TotalCount:
+    return await _count_crud(db, select(models.AuthorOrm.id))
+
+def material_sort_field(sort: schemas.MaterialSortEnum) -> str:
+    """Coluna da ordenação (também a chave nas linhas de get_materials_rows_crud)."""
+    return sort.value.lstrip("-")
+
+def _filter_materials(query, filters: Optional[schemas.MaterialFilters]):
+    if filters is None:
+        return query
+    if filters.status is not None:
+        query = query.filter(models.MaterialOrm.status == filters.status)
+    if filters.material_type is not None:
+        query = query.filter(models.MaterialOrm.material_type == filters.material_type)
+    if filters.author_id is not None:
+        query = query.filter(models.MaterialOrm.author_id == filters.author_id)
+    if filters.uploader_id is not None:
+        query = query.filter(models.MaterialOrm.uploader_id == filters.uploader_id)
+    if filters.published_from is not None:
+        query = query.filter(models.MaterialOrm.publication_date >= filters.published_from)
+    if filters.published_to is not None:
+        query = query.filter(models.MaterialOrm.publication_date <= filters.published_to)
+    return query
+
+def _order_materials(query, sort: schemas.MaterialSortEnum, after: Optional[Cursor]):
+    # A ordenação sempre desempata pelo id, na mesma direção, para casar com os índices (..., id)
+    column = getattr(models.MaterialOrm, material_sort_field(sort))
+    id_column = models.MaterialOrm.id
+    descending = sort.value.startswith("-")
+    columns = [id_column] if column is id_column else [column, id_column]
+    query = query.order_by(*(c.desc() if descending else c for c in columns))
+    if after is not None:
+        # Paginação por cursor (keyset): continua a partir da última linha vista, sem OFFSET
+        query = query.filter(
+            keyset_condition(column, id_column, after, descending=descending, nullable=column.expression.nullable)
+        )
+    return query
+
+async def get_materials_crud(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    after: Optional[Cursor] = None,
+    load_author: bool = True,
+    only: Optional[Sequence[str]] = None,
+    filters: Optional[schemas.MaterialFilters] = None,
+    sort: schemas.MaterialSortEnum = schemas.MaterialSortEnum.id,
+) -> List[models.MaterialOrm]:
+    if only is not None:
+        # A coluna da ordenação é necessária para montar o próximo cursor
+        only = sorted({*only, material_sort_field(sort)})
+    query = select(models.MaterialOrm).options(*_material_load_options(load_author, only))
+    query = _order_materials(_filter_materials(query, filters), sort, after)
+    result = await db.execute(query.offset(skip).limit(limit))
     return list(result.scalars().all()) # Convertendo para lista
 
-async def get_material_crud(db: AsyncSession, material_id: int) -> Optional[models.MaterialOrm]:
-    result = await db.execute(
+async def get_material_crud(
+    db: AsyncSession, material_id: int, load_author: bool = True, only: Optional[Sequence[str]] = None
+) -> Optional[models.MaterialOrm]:
+    query = (
         select(models.MaterialOrm)
-        .options(selectinload(models.MaterialOrm.author))
+        .options(*_material_load_options(load_author, only))
         .filter(models.MaterialOrm.id == material_id)
     )
+    result = await db.execute(query)
     return result.scalars().first()
 
+async def get_materials_by_author_ids_crud(
+    db: AsyncSession, author_ids: Sequence[int]
+) -> Dict[int, List[models.MaterialOrm]]:
+    """Busca os materiais de vários autores em um único round trip, agrupados por author_id."""
+    result = await db.execute(
+        select(models.MaterialOrm)
+        .filter(models.MaterialOrm.author_id == _id_array("author_ids", author_ids))
+        .order_by(models.MaterialOrm.id)
+    )
+    grouped: Dict[int, List[models.MaterialOrm]] = {author_id: [] for author_id in author_ids}
+    for material in result.scalars().all():
+        grouped[material.author_id].append(material)
+    return grouped
+
 async def update_material_crud(
-    db: AsyncSession, material_db_obj: models.MaterialOrm, material_in: schemas.MaterialUpdate
-) -> models.MaterialOrm:
+    db: AsyncSession, material_id: int, material_in: schemas.MaterialUpdate
+) -> Optional[models.MaterialOrm]:
+    """UPDATE ... RETURNING com o autor; None se o material não existe."""
     update_data = material_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(material_db_obj, field, value)
-    db.add(material_db_obj)
-    await db.commit()
-    await db.refresh(material_db_obj)
-    return material_db_obj
+    if not update_data:
+        # Nada a alterar (e sem time_updated novo), como no flush sem mudanças
+        return await get_material_crud(db, material_id=material_id)
+    return await _write_material_returning(
+        db,
+        update(models.MaterialOrm).where(models.MaterialOrm.id == material_id).values(**update_data),
+    )
 
 async def delete_material_crud(db: AsyncSession, material_id: int) -> Optional[models.MaterialOrm]:
-    db_material = await get_material_crud(db, material_id=material_id)
-    if db_material:
-        await db.delete(db_material)
-        await db.commit()
-    return db_material
+    """DELETE ... RETURNING com o autor; devolve o material removido ou None se não existia."""
+    return await _write_material_returning(
+        db, delete(models.MaterialOrm).where(models.MaterialOrm.id == material_id)
+    )
+
+
+# --- Consultas de linhas (serialização rápida) ---
+# Selecionam só as colunas dos schemas de resposta e devolvem dicts prontos para o encoder JSON,
+# sem instanciar objetos ORM nem modelos Pydantic. Usadas quando FAST_JSON_RESPONSES está ativo.
+
+def _columns_for(model, schema) -> list:
+    # A ordem e o conjunto de colunas seguem o schema Pydantic documentado no OpenAPI
+    table = model.__table__
+    return [table.c[name] for name in schema.model_fields if name in table.c]
+
+_MATERIAL_ROW_COLUMNS = _columns_for(models.MaterialOrm, schemas.MaterialRecord)
+_AUTHOR_ROW_COLUMNS = _columns_for(models.AuthorOrm, schemas.Author)
+_USER_ROW_COLUMNS = _columns_for(models.UserOrm, schemas.User)
+_AUTHOR_ROW_LABELS = [(column.name, f"author__{column.name}") for column in _AUTHOR_ROW_COLUMNS]
+
+# Cabeçalho -> chave da linha, para exportações planas (CSV)
+MATERIAL_ROW_FIELDS = [(column.name, column.name) for column in _MATERIAL_ROW_COLUMNS] + [
+    (f"author.{name}", label) for name, label in _AUTHOR_ROW_LABELS
+]
+
+def _material_rows_query():
+    return select(
+        *_MATERIAL_ROW_COLUMNS,
+        *(column.label(label) for column, (_, label) in zip(_AUTHOR_ROW_COLUMNS, _AUTHOR_ROW_LABELS)),
+    ).join_from(models.MaterialOrm, models.AuthorOrm, models.MaterialOrm.author_id == models.AuthorOrm.id)
+
+def materials_rows_query(
+    filters: Optional[schemas.MaterialFilters] = None,
+    sort: schemas.MaterialSortEnum = schemas.MaterialSortEnum.id,
+    after: Optional[Cursor] = None,
+):
+    """SELECT filtrado e ordenado das listagens por linhas (também usado por tests/test_material_filter_plans.py)."""
+    return _order_materials(_filter_materials(_material_rows_query(), filters), sort, after)
+
+def nest_author(row) -> dict:
+    material = {column.name: row[column.name] for column in _MATERIAL_ROW_COLUMNS}
+    material["author"] = {name: row[label] for name, label in _AUTHOR_ROW_LABELS}
+    return material
+
+async def get_materials_rows_crud(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    after: Optional[Cursor] = None,
+    filters: Optional[schemas.MaterialFilters] = None,
+    sort: schemas.MaterialSortEnum = schemas.MaterialSortEnum.id,
+) -> List[dict]:
+    query = materials_rows_query(filters=filters, sort=sort, after=after)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return [nest_author(row) for row in result.mappings()]
+
+async def get_material_row_crud(db: AsyncSession, material_id: int) -> Optional[dict]:
+    result = await db.execute(_material_rows_query().filter(models.MaterialOrm.id == material_id))
+    row = result.mappings().first()
+    return nest_author(row) if row is not None else None
+
+# --- Busca textual ---
+# Trechos destacados: o título inteiro e até dois fragmentos da descrição
+_TITLE_HEADLINE_OPTIONS = "HighlightAll=true, StartSel=<mark>, StopSel=</mark>"
+_SNIPPET_HEADLINE_OPTIONS = (
+    'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MinWords=8, MaxWords=25, FragmentDelimiter=" ... "'
+)
+
+def _search_config():
+    return cast(models.SEARCH_TEXT_CONFIG, REGCONFIG)
+
+async def search_materials_rows_crud(
+    db: AsyncSession,
+    q: str,
+    limit: int = 10,
+    after: Optional[Cursor] = None,
+    filters: Optional[schemas.MaterialFilters] = None,
+) -> List[dict]:
+    """
+    Busca textual (sintaxe de websearch_to_tsquery: "frase", OR, -termo) em título, revista,
+    descrição e nome do autor, do mais para o menos relevante (ts_rank, desempate por id).
+    Os candidatos vêm dos índices GIN de materials e authors (os SEARCH_MAX_CANDIDATES mais recentes,
+    por id, de cada): acima desse número o ranking é aproximado. ts_headline só roda nas linhas da página.
+    Linhas no formato de get_materials_rows_crud, com rank, title_highlight e snippet.
+    """
+    material, author = models.MaterialOrm, models.AuthorOrm
+    tsquery = func.websearch_to_tsquery(_search_config(), q)
+    # Cada índice contribui com no máximo SEARCH_MAX_CANDIDATES ids: ts_rank é calculado linha a
+    # linha, e um termo presente em boa parte do catálogo custaria segundos para ordenar inteiro.
+    # Os candidatos são sempre os mais recentes (ORDER BY id): o mesmo conjunto a cada requisição,
+    # para que as páginas do cursor não pulem nem repitam resultados.
+    candidates = union(
+        _filter_materials(select(material.id), filters)
+        .filter(material.search_vector.bool_op("@@")(tsquery))
+        .order_by(material.id.desc())
+        .limit(settings.SEARCH_MAX_CANDIDATES),
+        _filter_materials(select(material.id), filters)
+        .join(author, material.author_id == author.id)
+        .filter(author.search_vector.bool_op("@@")(tsquery))
+        .order_by(material.id.desc())
+        .limit(settings.SEARCH_MAX_CANDIDATES),
+    ).subquery("search_candidates")
+    rank = func.ts_rank(material.search_vector.op("||")(author.search_vector), tsquery)
+    page_query = (
+        select(material.id, rank.label("rank"))
+        .select_from(candidates)
+        .join(material, material.id == candidates.c.id)
+        .join(author, material.author_id == author.id)
+    )
+    if after is not None:
+        page_query = page_query.filter(keyset_condition(rank, material.id, after, descending=True))
+    page = page_query.order_by(rank.desc(), material.id.desc()).limit(limit).cte("search_page")
+
+    query = (
+        _material_rows_query()
+        .join(page, page.c.id == material.id)
+        .add_columns(
+            page.c.rank,
+            func.ts_headline(_search_config(), material.title, tsquery, _TITLE_HEADLINE_OPTIONS).label("title_highlight"),
+            func.ts_headline(_search_config(), material.description, tsquery, _SNIPPET_HEADLINE_OPTIONS).label("snippet"),
+        )
+        .order_by(page.c.rank.desc(), material.id.desc())
+    )
+    result = await db.execute(query)
+    hits = []
+    for row in result.mappings():
+        hit = nest_author(row)
+        hit.update(rank=row["rank"], title_highlight=row["title_highlight"], snippet=row["snippet"])
+        hits.append(hit)
+    return hits
+
+async def stream_materials_rows_crud(
+    db: AsyncSession,
+    filters: Optional[schemas.MaterialFilters] = None,
+    since: Optional[datetime] = None,
+    chunk_size: int = 1000,
+) -> AsyncIterator[list]:
+    """
+    Percorre o catálogo inteiro com um cursor do lado do servidor (AsyncSession.stream + yield_per),
+    entregando blocos de até chunk_size linhas: a memória fica constante qualquer que seja o tamanho da tabela.
+    As linhas têm o formato de _material_rows_query (colunas do autor com prefixo author__).
+    Os filtros são os mesmos da listagem (_filter_materials); since é exclusivo da exportação.
+    """
+    query = _filter_materials(_material_rows_query(), filters).order_by(models.MaterialOrm.id)
+    if since is not None:
+        # time_updated fica nulo até a primeira alteração; nesse caso vale a data de criação
+        query = query.filter(
+            func.coalesce(models.MaterialOrm.time_updated, models.MaterialOrm.time_created) >= since
+        )
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    async for partition in result.mappings().partitions(chunk_size):
+        yield partition
+
+async def get_authors_rows_crud(
+    db: AsyncSession, skip: int = 0, limit: int = 10, after: Optional[Cursor] = None
+) -> List[dict]:
+    query = select(*_AUTHOR_ROW_COLUMNS).order_by(models.AuthorOrm.id)
+    if after is not None:
+        query = query.filter(keyset_condition(models.AuthorOrm.id, models.AuthorOrm.id, after))
+    result = await db.execute(query.offset(skip).limit(limit))
+    return [dict(row) for row in result.mappings()]
+
+async def get_author_row_crud(db: AsyncSession, author_id: int) -> Optional[dict]:
+    result = await db.execute(select(*_AUTHOR_ROW_COLUMNS).filter(models.AuthorOrm.id == author_id))
+    row = result.mappings().first()
+    return dict(row) if row is not None else None
+
+async def get_users_rows_crud(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[dict]:
+    result = await db.execute(
+        select(*_USER_ROW_COLUMNS).order_by(models.UserOrm.id).offset(skip).limit(limit)
+    )
+    return [dict(row) for row in result.mappings()]
+
+async def get_user_row_crud(db: AsyncSession, user_id: int) -> Optional[dict]:
+    result = await db.execute(select(*_USER_ROW_COLUMNS).filter(models.UserOrm.id == user_id))
+    row = result.mappings().first()
+    return dict(row) if row is not None else None
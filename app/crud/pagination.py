@@ -0,0 +1,117 @@
+# app/crud/pagination.py
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import and_, or_, tuple_
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """Levantada quando um cursor 'after' não pode ser decodificado."""
+
+
+class Cursor(NamedTuple):
+    """Posição de uma página: chave de ordenação, valor dessa chave e id da última linha."""
+    sort_key: str
+    value: Any
+    id: int
+
+
+def _encode_value(value: Any) -> Any:
+    # datetime herda de date, então precisa ser testado primeiro
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+        raise InvalidCursorError("Valor de cursor desconhecido")
+    return value
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+# Tipo do valor guardado no cursor para cada chave de ordenação (sem o prefixo "-" da decrescente).
+# Um valor de outro tipo chegaria ao Postgres na comparação do keyset e falharia lá (DataError).
+_SORT_VALUE_CHECKS = {
+    "id": _is_int,
+    "title": lambda value: isinstance(value, str),
+    "publication_date": lambda value: value is None or (isinstance(value, date) and not isinstance(value, datetime)),
+    "rank": lambda value: _is_int(value) or isinstance(value, float),
+}
+
+
+def encode_cursor(sort_key: str, value: Any, id: int) -> str:
+    """Gera o token opaco (base64 url-safe) que aponta para depois da linha informada."""
+    payload = json.dumps([sort_key, _encode_value(value), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """
+    Decodifica um token gerado por encode_cursor. Levanta InvalidCursorError se inválido,
+    inclusive se o valor não for do tipo da chave de ordenação.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sort_key, value, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(sort_key, str) or not _is_int(id):
+            raise ValueError
+        value = _decode_value(value)
+        check_value = _SORT_VALUE_CHECKS.get(sort_key.lstrip("-"))
+        if check_value is None or not check_value(value):
+            raise InvalidCursorError("Valor do cursor não corresponde à ordenação")
+        return Cursor(sort_key, value, id)
+    except InvalidCursorError:
+        raise
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Cursor inválido")
+
+
+def keyset_condition(sort_column, id_column, cursor: Cursor, descending: bool = False, nullable: bool = False):
+    """
+    Condição WHERE que continua a ordenação (sort_column, id_column) depois do cursor.
+    Usa comparação de tupla, que o Postgres resolve com um index scan começando na posição certa,
+    em vez de percorrer e descartar as linhas anteriores como o OFFSET faz.
+    Com nullable=True segue a ordem padrão do Postgres (e dos índices): NULL depois dos valores
+    na ordem crescente e antes deles na decrescente.
+    """
+    if sort_column is id_column:
+        return id_column < cursor.id if descending else id_column > cursor.id
+    if descending:
+        after = tuple_(sort_column, id_column) < tuple_(cursor.value, cursor.id)
+    else:
+        after = tuple_(sort_column, id_column) > tuple_(cursor.value, cursor.id)
+    if not nullable:
+        return after
+    if cursor.value is None:
+        # O cursor está no bloco de NULLs: continua nele pelo id (e, na decrescente, segue para os valores)
+        same_block = and_(sort_column.is_(None), id_column < cursor.id if descending else id_column > cursor.id)
+        return or_(same_block, sort_column.isnot(None)) if descending else same_block
+    return after if descending else or_(after, sort_column.is_(None))
+
+
+def split_page(
+    items: Sequence[T], limit: int, sort_key: str, sort_value: Callable[[T], Any], id_of: Callable[[T], int]
+) -> Tuple[List[T], Optional[str]]:
+    """
+    Recebe até limit + 1 itens e devolve (página, next_cursor).
+    O item extra só serve para saber se existe uma próxima página.
+    """
+    page = list(items[:limit])
+    if len(items) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(sort_key, sort_value(last), id_of(last))
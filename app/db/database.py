@@ -1,12 +1,77 @@
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+import sqlalchemy.exc
 from app.core.config import settings
+from app.core.metrics import Counter, Histogram
+from app.core.request_metrics import instrument_engine
+from app.db.slow_queries import install_slow_query_log
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 
 DATABASE_URL = settings.DATABASE_URL
 
+logger = logging.getLogger(__name__)
+
+# --- Instrumentação do pool ---
+POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Tempo para obter uma conexão do pool (espera + abertura de conexões novas)"
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts", "Checkouts que desistiram após DB_POOL_TIMEOUT segundos"
+)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Pool padrão do engine assíncrono, medindo o tempo de checkout e contando os timeouts."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
+def _connect_args() -> Dict[str, Any]:
+    if settings.DB_TRANSACTION_POOLING:
+        # Atrás de um pooler em modo transação (ex: PgBouncer) cada transação pode cair em outra
+        # conexão do servidor: prepared statements não podem ser reaproveitados nem ter nomes fixos.
+        return {
+            "statement_cache_size": 0, # cache do asyncpg
+            "prepared_statement_cache_size": 0, # cache do dialeto do SQLAlchemy
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+
+def _create_engine(url: str):
+    async_engine = create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(),
+    )
+    instrument_engine(async_engine) # queries e tempo de banco por requisição (/metrics)
+    if settings.SLOW_QUERY_LOG:
+        install_slow_query_log(async_engine)
+    return async_engine
+
 # Cria o engine assíncrono do SQLAlchemy
-# echo=True é útil para debugging, pois mostra as queries SQL geradas
-engine = create_async_engine(DATABASE_URL, echo=True)
+# O SQL gerado só é logado com DB_ECHO=true, pelo logging configurado em app.core.logging_config
+engine = _create_engine(DATABASE_URL)
+
+# Engine da réplica de leitura (None sem READ_DATABASE_URL: tudo vai para a primária)
+read_engine = _create_engine(settings.READ_DATABASE_URL) if settings.READ_DATABASE_URL else None
 
 # Cria uma fábrica de sessões assíncronas
 # expire_on_commit=False evita que atributos expirem após o commit,
@@ -16,6 +81,103 @@ AsyncSessionLocal = sessionmaker(
     class_=AsyncSession,
     expire_on_commit=False
 )
+ReadSessionLocal = (
+    sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
+    if read_engine is not None
+    else AsyncSessionLocal
+)
+
+# Atraso de replicação em segundos: 0 se a réplica já aplicou tudo o que recebeu (ou se não é
+# uma standby, ex: outro banco usado como réplica em desenvolvimento)
+_REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class ReplicaMonitor:
+    """
+    Decide se a réplica pode atender leituras: o atraso medido precisa estar dentro de
+    REPLICA_MAX_LAG_SECONDS. A medição é refeita no máximo a cada REPLICA_LAG_CHECK_INTERVAL
+    segundos; se a réplica não responder, as leituras voltam para a primária.
+    """
+
+    def __init__(self, replica_engine, max_lag: float, check_interval: float):
+        self.engine = replica_engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_seconds: Optional[float] = None
+        self.usable = False
+        self._checked_at = float("-inf")
+
+    async def is_usable(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self.usable
+        self._checked_at = now # requisições concorrentes usam o resultado anterior
+        try:
+            async with self.engine.connect() as conn:
+                self.lag_seconds = float((await conn.execute(_REPLICA_LAG_SQL)).scalar())
+        except (OSError, sqlalchemy.exc.SQLAlchemyError) as e:
+            logger.warning("Réplica de leitura indisponível, usando a primária: %s", e)
+            self.lag_seconds, self.usable = None, False
+        else:
+            self.usable = self.lag_seconds <= self.max_lag
+        return self.usable
+
+replica_monitor = (
+    ReplicaMonitor(read_engine, settings.REPLICA_MAX_LAG_SECONDS, settings.REPLICA_LAG_CHECK_INTERVAL)
+    if read_engine is not None
+    else None
+)
+
+async def dispose_engines() -> None:
+    """Fecha as conexões dos pools (primária e réplica). Chamado no shutdown de cada worker."""
+    await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
+
+def _discard_inherited_pools() -> None:
+    # Num processo criado por fork (ex: gunicorn com --preload) as conexões herdadas são do processo pai:
+    # close=False só esquece essas conexões, sem fechar os sockets que o pai continua usando
+    for async_engine in (engine, read_engine):
+        if async_engine is not None:
+            async_engine.sync_engine.dispose(close=False)
+
+os.register_at_fork(after_in_child=_discard_inherited_pools)
+
+async def get_read_sessionmaker() -> sessionmaker:
+    """Fábrica de sessões para leituras: a da réplica se ela estiver dentro do atraso tolerado."""
+    if replica_monitor is not None and await replica_monitor.is_usable():
+        return ReadSessionLocal
+    return AsyncSessionLocal
+
+def _pool_stats(pool) -> Dict[str, Any]:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0), # negativo enquanto o pool ainda não abriu todas as conexões
+    }
+
+def pool_stats() -> Dict[str, Any]:
+    """Estado atual dos pools deste worker e histograma (em segundos) do tempo de checkout."""
+    stats = {
+        **_pool_stats(engine.sync_engine.pool),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checkout_timeouts": POOL_CHECKOUT_TIMEOUTS.value,
+        "checkout_seconds": POOL_CHECKOUT_SECONDS.snapshot(), # primária e réplica somadas
+        "transaction_pooling": settings.DB_TRANSACTION_POOLING,
+    }
+    if replica_monitor is not None:
+        stats["replica"] = {
+            **_pool_stats(read_engine.sync_engine.pool),
+            "lag_seconds": replica_monitor.lag_seconds,
+            "max_lag_seconds": replica_monitor.max_lag,
+            "usable": replica_monitor.usable,
+        }
+    return stats
 
 # Função para obter uma sessão de banco de dados (dependência)
 async def get_db_session() -> AsyncSession:
@@ -26,4 +188,16 @@ async def get_db_session() -> AsyncSession:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+# Sessão para rotas somente leitura (GETs e queries GraphQL); escritas e autenticação usam get_db_session
+async def get_read_db_session() -> AsyncSession:
+    session_factory = await get_read_sessionmaker()
+    async with session_factory() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
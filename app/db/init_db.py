@@ -1,27 +1,94 @@
 # app/db/init_db.py
 import asyncio
+import re
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn, CreateIndex
 from app.db.database import engine # Importa o engine
 from app.db.base_class import Base # Importa a Base que contém os metadados das tabelas
 # Importar os modelos ORM para que Base.metadata seja populado
 from app.models import models # noqa: F401 (para o linter não reclamar de import não usado diretamente)
 
+# Extensões usadas pelos índices dos modelos (pg_trgm: ix_authors_name_trgm)
+REQUIRED_EXTENSIONS = ("pg_trgm",)
+
+# Chave do pg_advisory_xact_lock que serializa a criação das tabelas entre processos (réplicas da API)
+SCHEMA_LOCK_KEY = 7_143_200_001
+
+# Índices do schema atual e se estão válidos (um CREATE INDEX CONCURRENTLY interrompido deixa o índice inválido)
+_INDEXES_SQL = """
+    SELECT c.relname, i.indisvalid
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema()
+"""
+
+def create_missing_columns(sync_conn):
+    # Colunas geradas (STORED) são calculadas para todas as linhas existentes: reescreve a tabela
+    # com ACCESS EXCLUSIVE lock (leituras e escritas esperam). Por isso só roda na migração (migrate_schema).
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                print(f"Adicionando a coluna {table.name}.{column.name} (reescreve a tabela)...")
+                spec = CreateColumn(column).compile(dialect=sync_conn.dialect)
+                sync_conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {spec}")
+
+async def create_missing_indexes():
+    """
+    Cria os índices declarados nos modelos que faltam no banco com CREATE INDEX CONCURRENTLY:
+    a tabela continua aceitando leituras e escritas enquanto o índice é construído.
+    Cada índice roda fora de transação (AUTOCOMMIT), como o CONCURRENTLY exige; índices
+    inválidos deixados por uma execução interrompida são removidos e criados de novo.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        indexes = dict((await conn.execute(text(_INDEXES_SQL))).all())
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if indexes.get(index.name):
+                    continue
+                if index.name in indexes:
+                    print(f"Removendo o índice inválido {index.name}...")
+                    await conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}")
+                print(f"Criando o índice {index.name} em {table.name}...")
+                ddl = str(CreateIndex(index).compile(dialect=conn.dialect))
+                await conn.exec_driver_sql(re.sub(r"^CREATE (UNIQUE )?INDEX ", r"CREATE \1INDEX CONCURRENTLY ", ddl))
+
 async def create_tables_on_startup():
     """
     Cria todas as tabelas no banco de dados que são definidas
     e herdadas de Base.metadata.
+    Tabelas que já existem não são alteradas: colunas e índices novos vêm de migrate_schema.
     """
     async with engine.begin() as conn:
         # Em um ambiente de produção, você pode querer usar ferramentas de migração como Alembic
         # await conn.run_sync(Base.metadata.drop_all) # CUIDADO: Apaga todas as tabelas! Use apenas em dev.
+        # create_all verifica e depois cria: dois processos ao mesmo tempo criariam o mesmo tipo/índice
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        for extension in REQUIRED_EXTENSIONS:
+            await conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
         await conn.run_sync(Base.metadata.create_all)
     # Não é estritamente necessário descartar o engine aqui se ele for usado pela aplicação principal,
     # mas se este script fosse executado isoladamente, seria uma boa prática.
     # await engine.dispose()
 
+async def migrate_schema():
+    """
+    Migração explícita, fora do startup da API (scripts/create_tables.py ou python -m app.db.init_db):
+    cria as tabelas e, nas que já existem, as colunas e os índices declarados depois.
+    Colunas novas travam a tabela enquanto ela é reescrita; os índices são criados sem travar.
+    """
+    await create_tables_on_startup()
+    async with engine.begin() as conn:
+        await conn.run_sync(create_missing_columns)
+    await create_missing_indexes()
+
 async def main():
     """Função principal para executar a criação de tabelas como um script."""
     print("Iniciando criação/verificação de tabelas...")
-    await create_tables_on_startup()
+    await migrate_schema()
     print("Processo de tabelas concluído.")
     await engine.dispose() # Descartar o engine após o uso no script
 
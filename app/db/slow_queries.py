@@ -0,0 +1,202 @@
+# app/db/slow_queries.py
+"""
+Registro opt-in de queries lentas (SLOW_QUERY_LOG): cada query acima de SLOW_QUERY_THRESHOLD_MS é logada
+com a rota que a executou e guardada, agrupada pelo fingerprint do SQL normalizado, em um ranking em
+memória (por worker) das SLOW_QUERY_TOP_N mais lentas, servido em GET /api/v1/admin/slow-queries.
+
+Os valores dos parâmetros nunca são guardados, só o tipo (e o tamanho dos textos). Fora de produção
+(ENVIRONMENT != "production") o plano da execução mais lenta de cada fingerprint é capturado com
+EXPLAIN (ANALYZE, BUFFERS), em outra conexão e em uma transação desfeita no final. Só SELECTs são
+analisados: EXPLAIN ANALYZE executa a query de novo.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.request_metrics import current_route
+
+logger = logging.getLogger(__name__)
+
+# Limite de tempo do EXPLAIN ANALYZE (ms): ele repete a query, que já foi lenta uma vez
+EXPLAIN_TIMEOUT_MS = 30000
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s") # asyncpg e psycopg2
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\?(?:\s*,\s*\?)+") # IN ($1, $2, ...) com qualquer quantidade de itens
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_DATA_MODIFYING = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+
+def normalize_statement(statement: str) -> Tuple[str, str]:
+    """SQL sem valores (parâmetros e literais viram ?) e o fingerprint (hash curto) desse SQL."""
+    normalized = _PLACEHOLDER.sub("?", statement)
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("?, ...", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    return normalized, hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def _redact_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return f"<str len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {name: _redact_value(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+def _explainable(statement: str) -> bool:
+    return bool(_EXPLAINABLE.match(statement)) and not _DATA_MODIFYING.search(statement)
+
+
+@dataclass
+class SlowQuery:
+    fingerprint: str
+    statement: str # normalizado
+    calls: int
+    total_seconds: float
+    max_seconds: float
+    last_seen: datetime
+    # Da execução mais lenta:
+    route: Optional[str]
+    parameters: Any # redigidos
+    plan: Optional[str] = None
+
+
+class SlowQueryStore:
+    """As max_entries queries mais lentas (pela pior execução), uma por fingerprint. Seguro entre threads."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: Dict[str, SlowQuery] = {}
+        self._lock = threading.Lock()
+
+    def record(self, fingerprint: str, statement: str, seconds: float, route: Optional[str], parameters: Any) -> bool:
+        """Registra uma execução lenta. True se ela é a mais lenta do fingerprint (o plano deve ser recapturado)."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    fastest = min(self._entries.values(), key=lambda e: e.max_seconds)
+                    if fastest.max_seconds >= seconds:
+                        return False
+                    del self._entries[fastest.fingerprint]
+                self._entries[fingerprint] = SlowQuery(
+                    fingerprint, statement, 1, seconds, seconds, now, route, parameters
+                )
+                return True
+            entry.calls += 1
+            entry.total_seconds += seconds
+            entry.last_seen = now
+            if seconds <= entry.max_seconds:
+                return False
+            entry.max_seconds, entry.route, entry.parameters = seconds, route, parameters
+            return True
+
+    def set_plan(self, fingerprint: str, plan: str) -> None:
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is not None:
+                entry.plan = plan
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = [asdict(entry) for entry in self._entries.values()]
+        return sorted(entries, key=lambda e: e["max_seconds"], reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_queries = SlowQueryStore(settings.SLOW_QUERY_TOP_N)
+explain_enabled = settings.ENVIRONMENT != "production"
+_explaining = set() # fingerprints com EXPLAIN em andamento
+_explain_tasks = set() # referências às tasks até terminarem
+
+
+async def _capture_plan(async_engine, fingerprint: str, statement: str, parameters: Any) -> None:
+    try:
+        async with async_engine.connect() as conn:
+            # As queries do próprio EXPLAIN não entram no registro
+            conn = await conn.execution_options(slow_query_log=False)
+            transaction = await conn.begin()
+            try:
+                await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+                result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                slow_queries.set_plan(fingerprint, "\n".join(row[0] for row in result))
+            finally:
+                await transaction.rollback()
+    except Exception as e:
+        logger.warning("Não foi possível capturar o plano da query lenta %s: %s", fingerprint, e)
+    finally:
+        _explaining.discard(fingerprint)
+
+
+def _schedule_plan_capture(async_engine, fingerprint: str, statement: str, parameters: Any) -> None:
+    if fingerprint in _explaining:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError: # engine usado fora de um event loop
+        return
+    _explaining.add(fingerprint)
+    task = loop.create_task(_capture_plan(async_engine, fingerprint, statement, parameters))
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+
+def install_slow_query_log(async_engine) -> None:
+    """Passa a registrar as queries do engine (assíncrono) que demorarem mais que SLOW_QUERY_THRESHOLD_MS."""
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._slow_query_started
+        if elapsed < threshold or not context.execution_options.get("slow_query_log", True):
+            return
+        normalized, fingerprint = normalize_statement(statement)
+        route = current_route()
+        logger.warning(
+            "Query lenta (%.0f ms, %s) [%s]: %s", elapsed * 1000, route or "fora de requisição", fingerprint, normalized
+        )
+        # Em executemany só o formato de uma linha interessa
+        redacted = redact_parameters(parameters[0] if executemany and parameters else parameters)
+        slowest = slow_queries.record(fingerprint, normalized, elapsed, route, redacted)
+        if slowest and explain_enabled and not executemany and _explainable(statement):
+            _schedule_plan_capture(async_engine, fingerprint, statement, parameters)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+def slow_query_report() -> Dict[str, Any]:
+    """Configuração do registro e as queries mais lentas deste worker, da pior para a melhor."""
+    return {
+        "enabled": settings.SLOW_QUERY_LOG,
+        "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+        "explain": explain_enabled,
+        "queries": slow_queries.entries(),
+    }
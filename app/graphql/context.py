@@ -1,10 +1,19 @@
 # app/graphql/context.py
+import asyncio
+import inspect
+
 from fastapi import Depends
+from graphql import FieldNode
+from graphql.utilities import get_operation_ast
 from sqlalchemy.ext.asyncio import AsyncSession
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
 from typing import Dict, Any, Optional
 
 from app.api import deps # Para get_current_user, se necessário no contexto GraphQL
-from app.db.database import get_db_session
+from app.core.request_metrics import set_graphql_operation
+from app.db.database import get_db_session, get_read_sessionmaker
+from app.graphql.loaders import GraphQLLoaders
 from app.models import models as orm_models # Renomeado para evitar conflito
 
 async def get_graphql_context(
@@ -14,10 +23,72 @@ async def get_graphql_context(
 ) -> Dict[str, Any]:
     """
     Cria o contexto para as resolvers GraphQL.
-    Inclui a sessão do banco de dados e, opcionalmente, o usuário atual.
+    Inclui a sessão do banco de dados, os DataLoaders da requisição e, opcionalmente, o usuário atual.
+    A sessão de leitura (réplica) é criada por DatabaseSessions, e só para queries.
     """
-    context = {"db": db}
+    db_lock = asyncio.Lock()
+    context = {"db": db, "db_lock": db_lock, "loaders": GraphQLLoaders(db, db_lock)}
     # if current_user:
     #     context["current_user"] = current_user
     #     context["current_user_id"] = current_user.id
     return context
+
+
+def _is_introspection(execution_context) -> bool:
+    """True se a operação só pede campos de introspecção (__schema, __type, __typename)."""
+    document = execution_context.graphql_document
+    operation = get_operation_ast(document, execution_context.operation_name) if document is not None else None
+    return operation is not None and all(
+        isinstance(selection, FieldNode) and selection.name.value.startswith("__")
+        for selection in operation.selection_set.selections
+    )
+
+
+class DatabaseSessions(SchemaExtension):
+    """
+    Uso das sessões do contexto durante uma operação GraphQL:
+    - queries ganham aqui uma sessão de leitura (réplica, se estiver dentro do atraso tolerado) como
+      info.context["db"] e nos DataLoaders. Mutations e introspecção não a criam, nem checam o atraso
+      da réplica; mutations continuam na primária, inclusive ao resolver os campos do resultado;
+    - ao fim da execução as sessões são fechadas e as conexões voltam ao pool, antes de a
+      resposta ser codificada e enviada (a AsyncSession só conecta no primeiro uso).
+    """
+
+    async def on_execute(self):
+        context = self.execution_context.context
+        sessions = [context["db"]]
+        if self.execution_context.operation_type == OperationType.QUERY and not _is_introspection(self.execution_context):
+            read_sessionmaker = await get_read_sessionmaker()
+            context["db"] = read_sessionmaker()
+            context["loaders"] = GraphQLLoaders(context["db"], context["db_lock"])
+            sessions.append(context["db"])
+        try:
+            yield
+        finally:
+            for session in sessions:
+                await session.close()
+
+    def resolve(self, _next, root, info, *args, **kwargs):
+        # Campos raiz de uma query rodam concorrentemente (ex: { material(id: 1) {...} author(id: 2) {...} })
+        # e compartilham a sessão: o lock da requisição os executa um de cada vez.
+        # Os campos filhos só resolvem depois que o campo raiz terminou, então não há espera aninhada.
+        result = _next(root, info, *args, **kwargs)
+        if info.path.prev is not None or not inspect.isawaitable(result):
+            return result
+
+        async def locked():
+            async with info.context["db_lock"]:
+                return await result
+        return locked()
+
+
+class OperationMetrics(SchemaExtension):
+    """Identifica a operação executada para as métricas por rota de /graphql (veja app.core.request_metrics)."""
+
+    def on_execute(self):
+        request = self.execution_context.context.get("request")
+        if request is not None:
+            set_graphql_operation(
+                request.scope, self.execution_context.operation_type.value, self.execution_context.operation_name
+            )
+        yield
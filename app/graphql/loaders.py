@@ -0,0 +1,35 @@
+# app/graphql/loaders.py
+import asyncio
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from strawberry.dataloader import DataLoader
+
+from app.crud import crud
+from app.models import models as orm_models
+
+
+class GraphQLLoaders:
+    """
+    DataLoaders de uma requisição GraphQL.
+    Cada loader junta todas as chaves pedidas no mesmo ciclo do event loop em uma única query
+    (WHERE id = ANY(...)), e nada é buscado se o campo não foi selecionado.
+    """
+
+    def __init__(self, db: AsyncSession, lock: Optional[asyncio.Lock] = None):
+        self.db = db
+        # A AsyncSession não aceita operações concorrentes; os loaders disparam no mesmo ciclo,
+        # então as queries em lote são serializadas por este lock (o mesmo dos campos raiz).
+        self._lock = lock or asyncio.Lock()
+        self.author_by_id = DataLoader(load_fn=self._load_authors)
+        self.materials_by_author_id = DataLoader(load_fn=self._load_materials_by_author)
+
+    async def _load_authors(self, keys: List[int]) -> List[Optional[orm_models.AuthorOrm]]:
+        async with self._lock:
+            authors = await crud.get_authors_by_ids_crud(self.db, author_ids=keys)
+        return [authors.get(key) for key in keys]
+
+    async def _load_materials_by_author(self, keys: List[int]) -> List[List[orm_models.MaterialOrm]]:
+        async with self._lock:
+            materials = await crud.get_materials_by_author_ids_crud(self.db, author_ids=keys)
+        return [materials[key] for key in keys]
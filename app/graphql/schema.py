@@ -1,33 +1,192 @@
 # app/graphql/schema.py
 import strawberry
-from typing import List, Optional
+from datetime import date, datetime
+from operator import itemgetter
+from typing import Annotated, List, Optional
 
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+import sqlalchemy.exc
 
 from app.models import models as orm_models # Renomeado para evitar conflito com tipos Strawberry
 from app.schemas import schemas as pydantic_schemas
 from app.crud import crud
-from app.graphql.context import get_graphql_context # Importa o context getter
+from app.crud import pagination
+from app.core.config import settings
+from app.core.response_cache import response_cache
+from app.graphql.context import DatabaseSessions, OperationMetrics, get_graphql_context # Importa o context getter
+from app.graphql.selection import selected_field_names
 
 # --- Tipos GraphQL ---
 
-# Usando pydantic.type para converter automaticamente schemas Pydantic para tipos Strawberry
-@strawberry.experimental.pydantic.type(model=pydantic_schemas.Author, all_fields=True)
+# Tipos Strawberry nativos: as resolvers devolvem diretamente os objetos ORM e cada campo é lido
+# com getattr só quando é selecionado (sem passar por validação Pydantic e cópia para outro objeto).
+# Os schemas Pydantic ficam apenas para validar os inputs das mutations.
+AuthorTypeEnum = strawberry.enum(orm_models.AuthorTypeEnum)
+MaterialTypeEnum = strawberry.enum(orm_models.MaterialTypeEnum)
+MaterialStatusEnum = strawberry.enum(orm_models.MaterialStatusEnum)
+BulkItemStatusEnum = strawberry.enum(pydantic_schemas.BulkItemStatusEnum)
+MaterialSortEnum = strawberry.enum(pydantic_schemas.MaterialSortEnum)
+
+@strawberry.type
 class AuthorGQLType:
-    pass
+    name: str
+    city: Optional[str]
+    author_type: Optional[AuthorTypeEnum]
+    id: int
+    time_created: datetime
+    time_updated: Optional[datetime]
+
+    @strawberry.field
+    async def materials(
+        self, info: strawberry.Info
+    ) -> List[Annotated["MaterialGQLType", strawberry.lazy("app.graphql.schema")]]:
+        # Resolvido pelo DataLoader: os materiais de todos os autores da resposta vêm em uma query só
+        return await info.context["loaders"].materials_by_author_id.load(self.id)
 
-@strawberry.experimental.pydantic.type(model=pydantic_schemas.Material, all_fields=True)
+@strawberry.type
 class MaterialGQLType:
-    # Strawberry tentará resolver 'author: Author' do Pydantic para AuthorGQLType.
-    # Se o Pydantic schema for `author: pydantic_schemas.Author`
-    # e você tiver `AuthorGQLType` definido, deve funcionar.
-    # Caso contrário, você pode definir explicitamente:
-    # author: AuthorGQLType
-    pass
+    title: str
+    description: Optional[str]
+    material_type: MaterialTypeEnum
+    status: MaterialStatusEnum
+    publication_date: Optional[date]
+    isbn: Optional[str]
+    pages: Optional[int]
+    doi: Optional[str]
+    journal_name: Optional[str]
+    duration_seconds: Optional[int]
+    video_url: Optional[str]
+    id: int
+    author_id: int
+    uploader_id: Optional[int]
+    time_created: datetime
+    time_updated: Optional[datetime]
+
+    # O autor é resolvido pelo DataLoader da requisição,
+    # só quando o campo é selecionado, e em lote para todos os materiais da resposta.
+    @strawberry.field
+    async def author(self, info: strawberry.Info) -> AuthorGQLType:
+        return await info.context["loaders"].author_by_id.load(self.author_id)
 
-@strawberry.experimental.pydantic.type(model=pydantic_schemas.User, all_fields=True)
+@strawberry.type
 class UserGQLType:
-    pass
+    username: str
+    email: str
+    id: int
+    is_active: bool
+    is_superuser: bool
+    time_created: datetime
+    time_updated: Optional[datetime]
+
+
+@strawberry.type
+class MaterialBulkItemResultGQLType:
+    index: int
+    status: BulkItemStatusEnum
+    id: Optional[int]
+    detail: Optional[str]
+
+@strawberry.type
+class MaterialBulkResultGQLType:
+    created: int
+    failed: int
+    results: List[MaterialBulkItemResultGQLType]
+
+
+def _prime_authors(info: strawberry.Info, authors_orm: List[orm_models.AuthorOrm]) -> None:
+    # Autores já lidos por uma query raiz não precisam ser buscados de novo pelo DataLoader
+    loader = info.context["loaders"].author_by_id
+    for author_orm in authors_orm:
+        loader.prime(author_orm.id, author_orm)
+
+
+# Colunas de MaterialOrm que podem ser projetadas a partir da seleção GraphQL
+_MATERIAL_COLUMNS = frozenset(attr.key for attr in sa_inspect(orm_models.MaterialOrm).column_attrs)
+# Sempre carregadas: a chave primária (identity map e cursor) e o author_id (DataLoader do autor)
+_MATERIAL_REQUIRED_COLUMNS = frozenset({"id", "author_id"})
+
+def _material_columns(info: strawberry.Info, *path: str) -> List[str]:
+    """Colunas de materials que a query GraphQL realmente pediu (para o load_only)."""
+    selected = selected_field_names(info, *path) & _MATERIAL_COLUMNS
+    return sorted(selected | _MATERIAL_REQUIRED_COLUMNS)
+
+
+# --- Páginas (paginação por cursor) ---
+
+@strawberry.type
+class TotalCountGQLType:
+    count: int
+    exact: bool # false: estimativa do planejador (acima de TOTAL_COUNT_EXACT_LIMIT linhas)
+
+async def _total_count(info: strawberry.Info, count):
+    # Campo filho: roda junto com os DataLoaders dos itens, que usam a mesma sessão
+    async with info.context["db_lock"]:
+        return await count(info.context["db"])
+
+@strawberry.type
+class MaterialPageGQLType:
+    items: List[MaterialGQLType]
+    next_cursor: Optional[str] = None # Passe em 'after' para buscar a próxima página
+    filters: strawberry.Private[Optional[pydantic_schemas.MaterialFilters]] = None
+
+    @strawberry.field
+    async def total_count(self, info: strawberry.Info) -> TotalCountGQLType:
+        """Total de materiais com os filtros da página (só é calculado se for pedido)."""
+        return await _total_count(info, lambda db: crud.count_materials_crud(db, filters=self.filters))
+
+@strawberry.type
+class MaterialSearchHitGQLType(MaterialGQLType):
+    rank: float
+    title_highlight: str # Termos encontrados entre <mark> e </mark>
+    snippet: Optional[str]
+
+@strawberry.type
+class MaterialSearchPageGQLType:
+    items: List[MaterialSearchHitGQLType]
+    next_cursor: Optional[str] = None
+
+@strawberry.type
+class AuthorPageGQLType:
+    items: List[AuthorGQLType]
+    next_cursor: Optional[str] = None
+
+    @strawberry.field
+    async def total_count(self, info: strawberry.Info) -> TotalCountGQLType:
+        """Total de autores (só é calculado se for pedido)."""
+        return await _total_count(info, crud.count_authors_crud)
+
+
+def _decode_after(after: Optional[str], sort_key: str = "id") -> Optional[pagination.Cursor]:
+    if after is None:
+        return None
+    try:
+        cursor = pagination.decode_cursor(after)
+    except pagination.InvalidCursorError:
+        raise Exception("Cursor 'after' inválido.")
+    if cursor.sort_key != sort_key:
+        raise Exception("Cursor 'after' gerado para outra ordenação.")
+    return cursor
+
+
+def _material_filters(filters: Optional["MaterialFilterGQLInput"]) -> Optional[pydantic_schemas.MaterialFilters]:
+    return filters.to_pydantic() if filters is not None else None
+
+
+async def _cached_record(key: str, record_schema, load):
+    """
+    Leitura read-through de um registro pelo cache do catálogo. Devolve o schema Pydantic, que os
+    tipos Strawberry leem com getattr assim como o objeto ORM; registros inexistentes não são cacheados.
+    """
+    cached = await response_cache.get(key)
+    if cached is not None:
+        return record_schema.model_validate_json(cached)
+    orm_obj = await load()
+    if orm_obj is None:
+        return None
+    record = record_schema.model_validate(orm_obj)
+    await response_cache.set(key, record.model_dump_json().encode())
+    return record
 
 
 # --- Inputs para Mutations ---
@@ -53,6 +212,10 @@ class AuthorCreateGQLInput:
 class UserCreateGQLInput:
     pass
 
+@strawberry.experimental.pydantic.input(model=pydantic_schemas.MaterialFilters, all_fields=True)
+class MaterialFilterGQLInput:
+    pass
+
 
 # --- Queries ---
 
@@ -63,19 +226,83 @@ class Query:
         self,
         info: strawberry.Info,
         skip: int = 0,
-        limit: int = 10
+        limit: int = 10,
+        after: Optional[str] = None,
+        filters: Optional[MaterialFilterGQLInput] = None,
+        sort: MaterialSortEnum = MaterialSortEnum.id
     ) -> List[MaterialGQLType]:
         db: AsyncSession = info.context["db"]
-        materials_orm = await crud.get_materials_crud(db, skip=skip, limit=limit)
-        # A conversão de ORM para Pydantic e depois para Strawberry é feita pelo .from_pydantic
-        return [MaterialGQLType.from_pydantic(pydantic_schemas.Material.from_orm(m)) for m in materials_orm]
+        # O autor não é carregado aqui; MaterialGQLType.author usa o DataLoader se for pedido
+        materials_orm = await crud.get_materials_crud(
+            db, skip=skip, limit=limit, after=_decode_after(after, sort.value), load_author=False,
+            only=_material_columns(info), filters=_material_filters(filters), sort=sort
+        )
+        return materials_orm
+
+    @strawberry.field
+    async def materials_page(
+        self,
+        info: strawberry.Info,
+        limit: int = 10,
+        after: Optional[str] = None,
+        filters: Optional[MaterialFilterGQLInput] = None,
+        sort: MaterialSortEnum = MaterialSortEnum.id
+    ) -> MaterialPageGQLType:
+        """Paginação por cursor: o custo de qualquer página é o mesmo da primeira."""
+        db: AsyncSession = info.context["db"]
+        material_filters = _material_filters(filters)
+        materials_orm = await crud.get_materials_crud(
+            db, limit=limit + 1, after=_decode_after(after, sort.value), load_author=False,
+            only=_material_columns(info, "items"), filters=material_filters, sort=sort
+        )
+        sort_field = crud.material_sort_field(sort)
+        materials_orm, next_cursor = pagination.split_page(
+            materials_orm, limit, sort.value, sort_value=lambda m: getattr(m, sort_field), id_of=lambda m: m.id
+        )
+        return MaterialPageGQLType(
+            items=materials_orm,
+            next_cursor=next_cursor,
+            filters=material_filters,
+        )
+
+    @strawberry.field
+    async def search_materials(
+        self,
+        info: strawberry.Info,
+        q: str,
+        limit: int = 10,
+        after: Optional[str] = None,
+        filters: Optional[MaterialFilterGQLInput] = None
+    ) -> MaterialSearchPageGQLType:
+        """Busca textual por relevância em título, revista, descrição e nome do autor."""
+        if not q.strip():
+            raise Exception("Informe os termos de busca.")
+        db: AsyncSession = info.context["db"]
+        rows = await crud.search_materials_rows_crud(
+            db, q=q, limit=limit + 1, after=_decode_after(after, "rank"), filters=_material_filters(filters)
+        )
+        rows, next_cursor = pagination.split_page(
+            rows, limit, "rank", sort_value=itemgetter("rank"), id_of=itemgetter("id")
+        )
+        hits = [pydantic_schemas.MaterialSearchHit.model_validate(row) for row in rows]
+        # Os autores já vieram na mesma query: MaterialGQLType.author não precisa buscá-los de novo
+        _prime_authors(info, [hit.author for hit in hits])
+        return MaterialSearchPageGQLType(items=hits, next_cursor=next_cursor)
 
     @strawberry.field
     async def material(self, info: strawberry.Info, id: int) -> Optional[MaterialGQLType]:
         db: AsyncSession = info.context["db"]
-        material_orm = await crud.get_material_crud(db, material_id=id)
+        if response_cache is not None:
+            # Com cache o registro é guardado completo, independente dos campos pedidos
+            return await _cached_record(
+                f"graphql:material:{id}", pydantic_schemas.MaterialRecord,
+                lambda: crud.get_material_crud(db, material_id=id, load_author=False),
+            )
+        material_orm = await crud.get_material_crud(
+            db, material_id=id, load_author=False, only=_material_columns(info)
+        )
         if material_orm:
-            return MaterialGQLType.from_pydantic(pydantic_schemas.Material.from_orm(material_orm))
+            return material_orm
         return None
 
     @strawberry.field
@@ -83,18 +310,47 @@ class Query:
         self,
         info: strawberry.Info,
         skip: int = 0,
-        limit: int = 10
+        limit: int = 10,
+        after: Optional[str] = None
     ) -> List[AuthorGQLType]:
         db: AsyncSession = info.context["db"]
-        authors_orm = await crud.get_authors_crud(db, skip=skip, limit=limit)
-        return [AuthorGQLType.from_pydantic(pydantic_schemas.Author.from_orm(a)) for a in authors_orm]
+        authors_orm = await crud.get_authors_crud(db, skip=skip, limit=limit, after=_decode_after(after))
+        _prime_authors(info, authors_orm)
+        return authors_orm
+
+    @strawberry.field
+    async def authors_page(
+        self,
+        info: strawberry.Info,
+        limit: int = 10,
+        after: Optional[str] = None
+    ) -> AuthorPageGQLType:
+        """Paginação por cursor de autores."""
+        db: AsyncSession = info.context["db"]
+        authors_orm = await crud.get_authors_crud(db, limit=limit + 1, after=_decode_after(after))
+        authors_orm, next_cursor = pagination.split_page(
+            authors_orm, limit, "id", sort_value=lambda a: a.id, id_of=lambda a: a.id
+        )
+        _prime_authors(info, authors_orm)
+        return AuthorPageGQLType(
+            items=authors_orm,
+            next_cursor=next_cursor,
+        )
 
     @strawberry.field
     async def author(self, info: strawberry.Info, id: int) -> Optional[AuthorGQLType]:
         db: AsyncSession = info.context["db"]
+        if response_cache is not None:
+            author = await _cached_record(
+                f"graphql:author:{id}", pydantic_schemas.Author, lambda: crud.get_author_crud(db, author_id=id)
+            )
+            if author:
+                _prime_authors(info, [author])
+            return author
         author_orm = await crud.get_author_crud(db, author_id=id)
         if author_orm:
-            return AuthorGQLType.from_pydantic(pydantic_schemas.Author.from_orm(author_orm))
+            _prime_authors(info, [author_orm])
+            return author_orm
         return None
 
     # Adicionar query para user (ex: user(id: int) ou me())
@@ -102,7 +358,7 @@ class Query:
     # async def me(self, info: strawberry.Info) -> Optional[UserGQLType]:
     #     current_user = info.context.get("current_user") # Supondo que get_graphql_context injete
     #     if current_user:
-    #         return UserGQLType.from_pydantic(pydantic_schemas.User.from_orm(current_user))
+    #         return current_user
     #     return None
 
 
@@ -123,19 +379,36 @@ class Mutation:
         # O .to_pydantic faz a conversão do input Strawberry para o Pydantic model
         pydantic_material_create = material_data.to_pydantic()
 
-        # Verifica se o autor existe
-        author_orm = await crud.get_author_crud(db, author_id=pydantic_material_create.author_id)
-        if not author_orm:
-            raise Exception(f"Autor com ID {pydantic_material_create.author_id} não encontrado.")
-
         # uploader_id pode vir do contexto se a mutação for protegida
         uploader_id_from_context = None # Exemplo: info.context.get("current_user_id")
-        created_material_orm = await crud.create_material_crud(
+        try:
+            created_material_orm = await crud.create_material_crud(
+                db=db,
+                material=pydantic_material_create,
+                uploader_id=uploader_id_from_context
+            )
+        except sqlalchemy.exc.IntegrityError as e:
+            # O autor é verificado pela chave estrangeira no próprio INSERT
+            if crud.foreign_key_violation(e):
+                raise Exception(f"Autor com ID {pydantic_material_create.author_id} não encontrado.")
+            raise Exception(crud.material_conflict_detail(e) or f"Erro de integridade dos dados: {e.orig}")
+        # O autor veio junto no INSERT ... RETURNING: evita que MaterialGQLType.author consulte o banco de novo
+        _prime_authors(info, [created_material_orm.author])
+        return created_material_orm
+
+    @strawberry.mutation
+    async def create_materials(
+        self, info: strawberry.Info, materials_data: List[MaterialCreateGQLInput]
+    ) -> MaterialBulkResultGQLType:
+        """Cria vários materiais em uma transação, com um resultado por item (igual a POST /materials/bulk)."""
+        db: AsyncSession = info.context["db"]
+        if len(materials_data) > settings.MATERIALS_BULK_MAX_ITEMS:
+            raise Exception(f"Máximo de {settings.MATERIALS_BULK_MAX_ITEMS} materiais por lote.")
+        return await crud.create_materials_bulk_crud(
             db=db,
-            material=pydantic_material_create,
-            uploader_id=uploader_id_from_context
+            materials=[material.to_pydantic() for material in materials_data],
+            uploader_id=None # Exemplo: info.context.get("current_user_id")
         )
-        return MaterialGQLType.from_pydantic(pydantic_schemas.Material.from_orm(created_material_orm))
 
     @strawberry.mutation
     async def create_author(
@@ -144,7 +417,7 @@ class Mutation:
         db: AsyncSession = info.context["db"]
         pydantic_author_create = author_data.to_pydantic()
         created_author_orm = await crud.create_author_crud(db=db, author=pydantic_author_create)
-        return AuthorGQLType.from_pydantic(pydantic_schemas.Author.from_orm(created_author_orm))
+        return created_author_orm
 
     @strawberry.mutation
     async def create_user(
@@ -153,16 +426,12 @@ class Mutation:
         db: AsyncSession = info.context["db"]
         pydantic_user_create = user_data.to_pydantic()
 
-        # Verificar se usuário ou email já existem
-        existing_user_by_username = await crud.get_user_by_username(db, username=pydantic_user_create.username)
-        if existing_user_by_username:
-            raise Exception(f"Username '{pydantic_user_create.username}' já registrado.")
-        existing_user_by_email = await crud.get_user_by_email(db, email=pydantic_user_create.email)
-        if existing_user_by_email:
-            raise Exception(f"Email '{pydantic_user_create.email}' já registrado.")
-
-        created_user_orm = await crud.create_user(db=db, user=pydantic_user_create)
-        return UserGQLType.from_pydantic(pydantic_schemas.User.from_orm(created_user_orm))
+        # Usuário ou email já existentes são detectados pelo índice único no INSERT
+        try:
+            created_user_orm = await crud.create_user(db=db, user=pydantic_user_create)
+        except sqlalchemy.exc.IntegrityError as e:
+            raise Exception(crud.user_conflict_detail(e) or f"Erro de integridade dos dados: {e.orig}")
+        return created_user_orm
 
 
 # Crie o schema GraphQL
@@ -170,5 +439,6 @@ class Mutation:
 graphql_schema = strawberry.Schema(
     query=Query,
     mutation=Mutation,
+    extensions=[DatabaseSessions, OperationMetrics],
     # types=[MaterialGQLType, AuthorGQLType, UserGQLType] # Opcional, Strawberry geralmente descobre
 )
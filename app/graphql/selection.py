@@ -0,0 +1,45 @@
+# app/graphql/selection.py
+import re
+from typing import Iterable, List, Set
+
+import strawberry
+from strawberry.types.nodes import SelectedField
+
+_CAMEL_BOUNDARY = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+def _to_snake_case(name: str) -> str:
+    # O schema usa auto_camel_case (ex: journalName -> journal_name)
+    return _CAMEL_BOUNDARY.sub("_", name).lower()
+
+
+def _flatten(selections: Iterable) -> List[SelectedField]:
+    # Fragmentos nomeados e inline contribuem com os campos deles
+    fields: List[SelectedField] = []
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            fields.append(selection)
+        else:
+            fields.extend(_flatten(selection.selections))
+    return fields
+
+
+def selected_field_names(info: strawberry.Info, *path: str) -> Set[str]:
+    """
+    Retorna os nomes (snake_case) dos campos pedidos pelo cliente abaixo do campo atual.
+    'path' desce por campos intermediários, ex: selected_field_names(info, "items") em materialsPage.
+    """
+    fields = _flatten(info.selected_fields)
+    for step in path:
+        fields = [
+            child
+            for field in fields
+            for child in _flatten(field.selections)
+            if _to_snake_case(child.name) == step
+        ]
+    return {
+        _to_snake_case(child.name)
+        for field in fields
+        for child in _flatten(field.selections)
+        if not child.name.startswith("__")
+    }
@@ -1,12 +1,23 @@
 # app/main.py
+import logging
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 from strawberry.fastapi import GraphQLRouter
 
-from app.api.routers import auth, users, authors, materials
+from app.api.routers import admin, auth, users, authors, materials
 from app.graphql.schema import graphql_schema # Importa o schema GraphQL montado
 from app.graphql.context import get_graphql_context # Importa o getter de contexto
 from app.db.init_db import create_tables_on_startup # Para criar tabelas no início (opcional)
+from app.db.database import dispose_engines
+from app.core.config import settings
+from app.core.response_cache import response_cache
+from app.core.metrics import render_prometheus
+from app.core.request_metrics import RequestMetricsMiddleware
+from app.core.logging_config import RequestLoggingMiddleware, configure_logging, shutdown_logging
+
+logger = logging.getLogger(__name__)
 
 # --- Eventos de Startup/Shutdown ---
 @asynccontextmanager
@@ -15,13 +26,20 @@ async def lifespan(app_instance: FastAPI):
     Executa ações no início da aplicação.
     Ideal para criar tabelas no banco de dados (em desenvolvimento).
     """
-    print("Aplicação iniciando...")
-    await create_tables_on_startup() # Cria tabelas se não existirem
-    print("Tabelas do banco de dados verificadas/criadas.")
-    print("Servidor pronto.")
+    configure_logging() # logs em JSON, escritos por uma thread (nada de escrita síncrona no event loop)
+    logger.info("Aplicação iniciando...")
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        # Só cria tabelas que não existem; colunas e índices novos são da migração (scripts/create_tables.py)
+        await create_tables_on_startup()
+        logger.info("Tabelas do banco de dados verificadas/criadas.")
+    logger.info("Servidor pronto.")
     yield
     # Código de limpeza
-    print("Aplicação encerrando...")
+    logger.info("Aplicação encerrando...")
+    if response_cache is not None:
+        await response_cache.close()
+    await dispose_engines() # fecha as conexões deste worker em vez de deixá-las para o Postgres derrubar
+    shutdown_logging() # escreve o que restou na fila
 
 app = FastAPI(
     title="Biblioteca Digital API",
@@ -29,6 +47,11 @@ app = FastAPI(
     version="0.2.0",
     lifespan=lifespan
 )
+# request_id e access log por requisição; por dentro das métricas, para enxergar a rota e as queries
+app.add_middleware(RequestLoggingMiddleware)
+# Latência por rota, queries e tempo de banco por requisição (expostos em /metrics)
+app.add_middleware(RequestMetricsMiddleware)
+
 # --- Montar Routers da API REST ---
 api_prefix = "/api/v1"
 
@@ -36,6 +59,7 @@ app.include_router(auth.router, prefix=f"{api_prefix}/auth", tags=["Autenticaç
 app.include_router(users.router, prefix=f"{api_prefix}/users", tags=["Usuários REST"])
 app.include_router(authors.router, prefix=f"{api_prefix}/authors", tags=["Autores REST"])
 app.include_router(materials.router, prefix=f"{api_prefix}/materials", tags=["Materiais REST"])
+app.include_router(admin.router, prefix=f"{api_prefix}/admin", tags=["Administração REST"])
 
 
 # --- Montar GraphQL ---
@@ -48,6 +72,17 @@ graphql_app_router = GraphQLRouter(
 app.include_router(graphql_app_router, prefix="/graphql", tags=["GraphQL"])
 
 
+# --- Métricas (Prometheus) ---
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """
+    Métricas deste worker no formato texto do Prometheus: latência por rota/operação GraphQL,
+    queries e tempo de banco por requisição, pool de conexões e hashing de senhas.
+    Não é autenticado: restrinja o acesso na rede (ex: só a partir do Prometheus).
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # --- Rota Raiz (Opcional) ---
 @app.get("/", tags=["Root"])
 async def read_root():
@@ -1,6 +1,7 @@
 import enum
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Enum as SAEnum, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, String, ForeignKey, DateTime, Boolean, Enum as SAEnum, Date, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func # Para default timestamps
 
 from app.db.base_class import Base
@@ -19,6 +20,9 @@ class MaterialStatusEnum(str, enum.Enum):
     published = "published"
     archived = "archived"
 
+# Configuração de texto da busca: a mesma na geração dos tsvector e no websearch_to_tsquery das consultas
+SEARCH_TEXT_CONFIG = "portuguese"
+
 class UserOrm(Base):
     __tablename__ = "users"
 
@@ -47,6 +51,18 @@ class AuthorOrm(Base):
 
     materials = relationship("MaterialOrm", back_populates="author")
 
+    # Documento da busca textual, mantido pelo próprio Postgres (coluna gerada).
+    # deferred: nunca é carregado junto com o objeto, só usado em filtros.
+    search_vector = deferred(Column(
+        TSVECTOR, Computed(f"to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce(name, ''))", persisted=True)
+    ))
+
+    __table_args__ = (
+        Index("ix_authors_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigramas (extensão pg_trgm): atende ILIKE 'prefixo%' e '% prefixo%' das sugestões de autores
+        Index("ix_authors_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
 class MaterialOrm(Base):
     __tablename__ = "materials"
 
@@ -74,3 +90,30 @@ class MaterialOrm(Base):
     journal_name = Column(String, nullable=True) # articles
     duration_seconds = Column(Integer, nullable=True) # videos
     video_url = Column(String, nullable=True) #videos
+
+    # Título pesa mais que a revista, que pesa mais que a descrição (ts_rank usa os pesos A/B/C).
+    # O nome do autor fica no search_vector de authors: uma coluna gerada não pode ler outra tabela.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce(journal_name, '')), 'B') || "
+            f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce(description, '')), 'C')",
+            persisted=True,
+        ),
+    ))
+
+    # Índices das listagens filtradas/ordenadas (get_materials_crud). Todos terminam em id,
+    # o desempate da paginação por cursor, para que a página seja lida já na ordem do índice.
+    __table_args__ = (
+        Index("ix_materials_status_publication_date", "status", "publication_date", "id"),
+        Index("ix_materials_publication_date", "publication_date", "id"),
+        # A chave estrangeira não é indexada automaticamente pelo Postgres
+        Index("ix_materials_author_id", "author_id", "id"),
+        # Parcial: materiais importados em lote não têm uploader
+        Index(
+            "ix_materials_uploader_id", "uploader_id", "id",
+            postgresql_where=uploader_id.isnot(None),
+        ),
+        Index("ix_materials_search_vector", "search_vector", postgresql_using="gin"),
+    )
@@ -1,6 +1,7 @@
+import enum
 from datetime import datetime, date # Para os timestamps e publication_date
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr, Field
 from app.models.models import AuthorTypeEnum, MaterialTypeEnum, MaterialStatusEnum
 
@@ -22,6 +23,23 @@ class User(UserBase):
     class Config:
         from_attributes = True
 
+class UserUpdate(BaseModel):
+    email: Optional[EmailStr] = None
+    password: Optional[str] = Field(None, min_length=8)
+    is_active: Optional[bool] = None
+    is_superuser: Optional[bool] = None
+
+class Principal(BaseModel):
+    # O mínimo do usuário autenticado que as rotas precisam (é o que fica no cache de get_current_user)
+    id: int
+    username: str
+    is_active: bool
+    is_superuser: bool
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
 # --- Token Schemas ---
 class Token(BaseModel):
     access_token: str
@@ -47,6 +65,13 @@ class Author(AuthorBase):
     class Config:
         from_attributes = True
 
+class AuthorSuggestion(BaseModel):
+    # Só o necessário para o autocomplete de author_id
+    id: int
+    name: str
+    city: Optional[str] = None
+    author_type: Optional[AuthorTypeEnum] = None
+
 # --- Material Schemas ---
 class MaterialBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
@@ -73,13 +98,65 @@ class MaterialUpdate(MaterialBase):
     author_id: Optional[int] = None # Permitir não atualizar o autor
 
 
-class Material(MaterialBase):
+class MaterialRecord(MaterialBase):
+    # Material sem o autor aninhado (o GraphQL resolve o autor sob demanda)
     id: int
     author_id: int
     uploader_id: Optional[int] = None
     time_created: datetime
     time_updated: Optional[datetime] = None
-    author: Author # Para mostrar dados do autor aninhados
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class Material(MaterialRecord):
+    author: Author # Para mostrar dados do autor aninhados
+
+class MaterialSearchHit(Material):
+    rank: float # ts_rank: maior é mais relevante
+    title_highlight: str # Título com os termos encontrados entre <mark> e </mark>
+    snippet: Optional[str] = None # Trechos da descrição com os termos destacados
+
+# --- Criação de materiais em lote ---
+class BulkItemStatusEnum(str, enum.Enum):
+    created = "created"
+    conflict = "conflict" # ISBN/DOI já existente (no banco ou repetido no próprio lote)
+    author_not_found = "author_not_found"
+
+class MaterialBulkItemResult(BaseModel):
+    index: int # Posição do item na lista enviada
+    status: BulkItemStatusEnum
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+class MaterialBulkResult(BaseModel):
+    created: int
+    failed: int
+    results: List[MaterialBulkItemResult]
+
+# --- Exportação ---
+class ExportFormatEnum(str, enum.Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+# --- Filtros e ordenação da listagem de materiais ---
+class MaterialFilters(BaseModel):
+    status: Optional[MaterialStatusEnum] = None
+    material_type: Optional[MaterialTypeEnum] = None
+    author_id: Optional[int] = None
+    uploader_id: Optional[int] = None
+    published_from: Optional[date] = None # publication_date >= published_from
+    published_to: Optional[date] = None # publication_date <= published_to
+
+class TotalCount(BaseModel):
+    count: int
+    exact: bool # False: estimativa do planejador (listas grandes)
+
+class MaterialSortEnum(str, enum.Enum):
+    # Só chaves cobertas por índices de MaterialOrm; o prefixo "-" indica ordem decrescente
+    id = "id"
+    id_desc = "-id"
+    publication_date = "publication_date"
+    publication_date_desc = "-publication_date"
+    title = "title"
+    title_desc = "-title"
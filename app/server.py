@@ -0,0 +1,70 @@
+# app/server.py
+"""
+Entrada de produção: python -m app.server
+
+Sobe SERVER_WORKERS processos do Uvicorn (por padrão um por CPU disponível) com uvloop e httptools.
+Os workers são processos novos (spawn) que importam o app cada um: engine, pool e caches são por worker.
+No SIGTERM (ex: docker stop), cada worker para de aceitar conexões, espera as requisições em andamento por
+até SERVER_GRACEFUL_SHUTDOWN_SECONDS e então roda o shutdown do lifespan, que fecha o pool de conexões.
+O stop_grace_period do contêiner deve ser maior que esse prazo.
+As tabelas que faltam são criadas uma vez, aqui, antes de subir os workers; eles não rodam DDL.
+
+Em desenvolvimento continue usando uvicorn app.main:app --reload (docker-compose.yml).
+"""
+import asyncio
+import logging
+import os
+
+import uvicorn
+
+from app.core.config import settings
+from app.db.database import engine
+from app.db.init_db import create_tables_on_startup
+
+logger = logging.getLogger(__name__)
+
+
+def worker_count() -> int:
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+    try:
+        return len(os.sched_getaffinity(0)) # respeita as CPUs reservadas ao contêiner (cpuset)
+    except AttributeError: # macOS/Windows
+        return os.cpu_count() or 1
+
+
+async def prepare_database() -> None:
+    await create_tables_on_startup()
+    await engine.dispose() # as conexões deste event loop não servem para os workers
+
+
+def main() -> None:
+    workers = worker_count()
+    connections = workers * (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    logging.basicConfig(level=logging.INFO)
+    logger.info(
+        "Iniciando %d workers em %s:%d (até %d conexões com o Postgres)",
+        workers, settings.SERVER_HOST, settings.SERVER_PORT, connections,
+    )
+    asyncio.run(prepare_database())
+    # Os workers leem as configurações do ambiente (spawn); com um só worker o app roda neste processo
+    os.environ["DB_CREATE_TABLES_ON_STARTUP"] = "false"
+    settings.DB_CREATE_TABLES_ON_STARTUP = False
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        lifespan="on",
+        access_log=False, # o access log é o app.access (app/core/logging_config.py)
+        server_header=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
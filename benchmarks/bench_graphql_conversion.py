@@ -0,0 +1,129 @@
+# benchmarks/bench_graphql_conversion.py
+"""
+Micro-benchmark do custo por linha das resolvers GraphQL de materiais.
+
+Compara o caminho antigo (ORM -> Pydantic.from_orm -> Strawberry.from_pydantic, com o autor aninhado)
+com os tipos Strawberry nativos, que resolvem os campos direto do objeto ORM.
+Não usa banco: as linhas são objetos ORM transientes montados em memória.
+
+Uso: python -m benchmarks.bench_graphql_conversion --rows 100 --repeat 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from typing import List
+
+import strawberry
+from strawberry.dataloader import DataLoader
+
+from app.graphql.schema import MaterialGQLType
+from app.models import models as orm_models
+from app.schemas import schemas as pydantic_schemas
+
+QUERY = "{ materials { id title materialType status publicationDate timeCreated author { id name } } }"
+
+
+# --- Caminho antigo (tipos gerados a partir dos schemas Pydantic) ---
+
+@strawberry.experimental.pydantic.type(model=pydantic_schemas.Author, all_fields=True)
+class LegacyAuthorGQLType:
+    pass
+
+@strawberry.experimental.pydantic.type(model=pydantic_schemas.Material, all_fields=True)
+class LegacyMaterialGQLType:
+    author: LegacyAuthorGQLType
+
+
+def legacy_convert(material_orm: orm_models.MaterialOrm) -> LegacyMaterialGQLType:
+    return LegacyMaterialGQLType.from_pydantic(pydantic_schemas.Material.model_validate(material_orm))
+
+
+def build_rows(count: int) -> List[orm_models.MaterialOrm]:
+    now = datetime.now(timezone.utc)
+    authors = [
+        orm_models.AuthorOrm(id=i, name=f"Autor {i}", author_type=orm_models.AuthorTypeEnum.person, time_created=now)
+        for i in range(1, 11)
+    ]
+    rows = []
+    for i in range(1, count + 1):
+        author = authors[i % len(authors)]
+        rows.append(orm_models.MaterialOrm(
+            id=i, title=f"Material {i}", description="Descrição " * 10,
+            material_type=orm_models.MaterialTypeEnum.book, status=orm_models.MaterialStatusEnum.published,
+            publication_date=date(2020, 1, 1), isbn=f"978-{i:09d}", pages=200,
+            author_id=author.id, author=author, time_created=now,
+        ))
+    return rows
+
+
+def build_schemas(rows: List[orm_models.MaterialOrm]):
+    @strawberry.type
+    class LegacyQuery:
+        @strawberry.field
+        def materials(self) -> List[LegacyMaterialGQLType]:
+            return [legacy_convert(m) for m in rows]
+
+    @strawberry.type
+    class NativeQuery:
+        @strawberry.field
+        def materials(self) -> List[MaterialGQLType]:
+            return rows
+
+    return strawberry.Schema(query=LegacyQuery), strawberry.Schema(query=NativeQuery)
+
+
+def native_context(rows: List[orm_models.MaterialOrm]) -> dict:
+    authors = {m.author_id: m.author for m in rows}
+
+    async def load_authors(keys):
+        return [authors[key] for key in keys]
+
+    return {"loaders": SimpleNamespace(author_by_id=DataLoader(load_fn=load_authors))}
+
+
+async def time_execution(schema, rows, repeat: int, context_factory) -> float:
+    samples = []
+    for _ in range(repeat):
+        context = context_factory(rows)
+        started = time.perf_counter()
+        result = await schema.execute(QUERY, context_value=context)
+        samples.append(time.perf_counter() - started)
+        assert result.errors is None, result.errors
+    return statistics.median(samples)
+
+
+def time_conversion(rows, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for m in rows:
+            legacy_convert(m)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def main(row_count: int, repeat: int) -> None:
+    rows = build_rows(row_count)
+    legacy_schema, native_schema = build_schemas(rows)
+
+    conversion = time_conversion(rows, repeat)
+    legacy = await time_execution(legacy_schema, rows, repeat, lambda _rows: {})
+    native = await time_execution(native_schema, rows, repeat, native_context)
+
+    per_row = lambda seconds: seconds / row_count * 1e6  # noqa: E731
+    print(f"{row_count} linhas por página, mediana de {repeat} execuções")
+    print(f"conversão ORM -> Pydantic -> Strawberry: {per_row(conversion):8.2f} µs/linha (eliminada)")
+    print(f"query completa, tipos Pydantic (antes):  {per_row(legacy):8.2f} µs/linha")
+    print(f"query completa, tipos nativos (depois):  {per_row(native):8.2f} µs/linha")
+    print(f"ganho: {legacy / native:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
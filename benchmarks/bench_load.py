@@ -0,0 +1,246 @@
+# benchmarks/bench_load.py
+"""
+Teste de carga da API em processo (cliente ASGI, sem rede nem servidor): vazão e latência p50/p95/p99
+por cenário REST e GraphQL, com comparação contra um baseline salvo em JSON.
+
+O banco precisa ter sido populado por benchmarks.dataset (mesmos parâmetros nas duas execuções
+comparadas). Cada cenário faz --warmup requisições não medidas e então --requests requisições com
+--concurrency clientes simultâneos; os parâmetros (ids, filtros, termos) vêm de um gerador com --seed fixa.
+Com --baseline, sai com código 1 se algum cenário perder mais que --tolerance de vazão ou piorar o p95
+além disso. Os números só são comparáveis na mesma máquina e com a mesma configuração (.env).
+
+Uso:
+    python -m benchmarks.dataset --authors 2000 --materials 100000   # uma vez, em um banco descartável
+    python -m benchmarks.bench_load --save baseline.json              # antes da mudança
+    python -m benchmarks.bench_load --baseline baseline.json          # depois da mudança
+    python -m benchmarks.bench_load --scenarios rest_material_detail graphql_materials_page --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+from sqlalchemy import text
+
+from app.crud import pagination
+from app.db.database import engine
+from app.main import app
+from benchmarks.dataset import BENCH_PASSWORD, BENCH_USERNAME, SEARCH_TERMS
+
+_FILTERS = (
+    {},
+    {"status": "published"},
+    {"status": "published", "sort": "-publication_date"},
+    {"material_type": "book", "sort": "title"},
+    {"published_from": "2000-01-01", "published_to": "2004-12-31"},
+)
+_MATERIALS_PAGE_QUERY = """
+query materialsPage($after: String) {
+  materialsPage(limit: 20, after: $after, filters: {status: published}) {
+    items { id title materialType publicationDate author { id name } }
+    nextCursor
+  }
+}
+"""
+_AUTHORS_WITH_MATERIALS_QUERY = """
+query authorsWithMaterials($after: String) {
+  authorsPage(limit: 10, after: $after) { items { id name materials { id title } } nextCursor }
+}
+"""
+_SEARCH_QUERY = """
+query search($q: String!) { searchMaterials(q: $q, limit: 10) { items { id titleHighlight rank } } }
+"""
+
+
+@dataclass
+class Dataset:
+    """Faixas de ids do banco populado e o token do usuário de benchmark."""
+    materials: int
+    authors: int
+    token: str
+
+
+Request = Callable[[httpx.AsyncClient, random.Random, Dataset], Awaitable[httpx.Response]]
+
+
+def _cursor_after(rng: random.Random, last_id: int) -> str:
+    return pagination.encode_cursor("id", (value := rng.randint(1, last_id)), value)
+
+
+async def rest_materials_list(client, rng, data):
+    return await client.get("/api/v1/materials/", params={"limit": 20, **rng.choice(_FILTERS)})
+
+
+async def rest_materials_deep_page(client, rng, data):
+    # Páginas no meio do catálogo, por cursor (sem OFFSET)
+    return await client.get("/api/v1/materials/", params={"limit": 20, "after": _cursor_after(rng, data.materials)})
+
+
+async def rest_material_detail(client, rng, data):
+    return await client.get(f"/api/v1/materials/{rng.randint(1, data.materials)}")
+
+
+async def rest_materials_search(client, rng, data):
+    return await client.get("/api/v1/materials/search", params={"q": rng.choice(SEARCH_TERMS), "limit": 10})
+
+
+async def rest_authors_suggest(client, rng, data):
+    prefix = rng.choice(("A", "Ca", "Fer", "Ma", "Sil", "Ro", "Ins", "Uni"))
+    return await client.get("/api/v1/authors/suggest", params={"prefix": prefix})
+
+
+async def auth_login(client, rng, data):
+    return await client.post("/api/v1/auth/token", data={"username": BENCH_USERNAME, "password": BENCH_PASSWORD})
+
+
+async def auth_me(client, rng, data):
+    return await client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {data.token}"})
+
+
+async def graphql_materials_page(client, rng, data):
+    variables = {"after": _cursor_after(rng, data.materials) if rng.random() < 0.5 else None}
+    return await client.post("/graphql", json={"query": _MATERIALS_PAGE_QUERY, "variables": variables})
+
+
+async def graphql_authors_with_materials(client, rng, data):
+    variables = {"after": _cursor_after(rng, data.authors)}
+    return await client.post("/graphql", json={"query": _AUTHORS_WITH_MATERIALS_QUERY, "variables": variables})
+
+
+async def graphql_search(client, rng, data):
+    return await client.post("/graphql", json={"query": _SEARCH_QUERY, "variables": {"q": rng.choice(SEARCH_TERMS)}})
+
+
+SCENARIOS: Dict[str, Request] = {
+    request.__name__: request
+    for request in (
+        rest_materials_list, rest_materials_deep_page, rest_material_detail, rest_materials_search,
+        rest_authors_suggest, auth_login, auth_me,
+        graphql_materials_page, graphql_authors_with_materials, graphql_search,
+    )
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _failed(response: httpx.Response) -> bool:
+    # GraphQL responde 200 mesmo com erro de resolver
+    if response.status_code >= 400:
+        return True
+    return response.request.url.path == "/graphql" and bool(response.json().get("errors"))
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, request: Request, data: Dataset, requests: int, concurrency: int, seed: int
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker(rng: random.Random) -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await request(client, rng, data)
+            latencies.append(time.perf_counter() - started)
+            errors += _failed(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(seed * 1000 + n)) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def load_dataset(client: httpx.AsyncClient) -> Dataset:
+    async with engine.connect() as conn:
+        materials = (await conn.execute(text("SELECT max(id) FROM materials"))).scalar()
+        authors = (await conn.execute(text("SELECT max(id) FROM authors"))).scalar()
+    response = await client.post("/api/v1/auth/token", data={"username": BENCH_USERNAME, "password": BENCH_PASSWORD})
+    if not materials or response.status_code != 200:
+        sys.exit("Banco sem o catálogo de benchmark: rode antes python -m benchmarks.dataset")
+    return Dataset(materials=materials, authors=authors, token=response.json()["access_token"])
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Imprime a variação de vazão e p95 de cada cenário e devolve os que regrediram além da tolerância."""
+    regressions = []
+    print(f"\nComparação com o baseline (tolerância {tolerance:.0%}):")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:32} sem baseline")
+            continue
+        throughput = result["throughput_rps"] / before["throughput_rps"] - 1
+        p95 = result["p95_ms"] / before["p95_ms"] - 1
+        regressed = throughput < -tolerance or p95 > tolerance
+        print(f"{name:32} vazão {throughput:+7.1%}  p95 {p95:+7.1%}  {'REGRESSÃO' if regressed else 'ok'}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        data = await load_dataset(client)
+        print(f"Catálogo: {data.materials} materiais, {data.authors} autores | "
+              f"{args.requests} requisições por cenário, {args.concurrency} clientes")
+        print(f"{'cenário':32} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6}")
+        results = {}
+        for name in args.scenarios:
+            request = SCENARIOS[name]
+            await run_scenario(client, request, data, args.warmup, args.concurrency, args.seed + 1)
+            result = await run_scenario(client, request, data, args.requests, args.concurrency, args.seed)
+            results[name] = result
+            print(f"{name:32} {result['throughput_rps']:8.1f} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+                  f"{result['p99_ms']:8.2f} {result['errors']:6d}")
+    await engine.dispose()
+
+    report = {
+        "config": {"requests": args.requests, "concurrency": args.concurrency, "seed": args.seed,
+                   "materials": data.materials, "authors": data.authors},
+        "scenarios": results,
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\nResultados salvos em {args.save}")
+    failed = [name for name, result in results.items() if result["errors"]]
+    if failed:
+        print(f"\nCenários com erros: {', '.join(failed)}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        if baseline["config"] != report["config"]:
+            print(f"\nAviso: configuração diferente da do baseline ({baseline['config']})")
+        failed += compare(results, baseline["scenarios"], args.tolerance)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="Requisições medidas por cenário")
+    parser.add_argument("--concurrency", type=int, default=10, help="Clientes simultâneos")
+    parser.add_argument("--warmup", type=int, default=20, help="Requisições não medidas antes de cada cenário")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", metavar="ARQUIVO", help="Salva os resultados (JSON) para usar como baseline")
+    parser.add_argument("--baseline", metavar="ARQUIVO", help="Compara com resultados salvos por --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Regressão tolerada (0.2 = 20%%)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
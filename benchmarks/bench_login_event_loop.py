@@ -0,0 +1,104 @@
+# benchmarks/bench_login_event_loop.py
+"""
+Teste de carga: latência da rota raiz (GET /) enquanto logins acontecem no mesmo worker.
+
+Três fases, todas no mesmo event loop:
+- ocioso: só as requisições a GET /;
+- bloqueante: rajadas de verify_password (bcrypt) rodando direto no event loop, como o login fazia antes;
+- pool: as mesmas rajadas via verify_password_async (pool de hashing).
+As requisições a GET / saem em horários fixos e a latência conta a partir do horário agendado: o tempo
+em que o event loop ficou travado aparece na medida. No modo bloqueante o p99 fica perto do custo de um
+bcrypt; com o pool, deve ficar próximo do ocioso. Com menos CPUs que PASSWORD_HASH_WORKERS, as threads
+de hashing disputam a CPU com o event loop e a cauda (p99) da fase pool cresce mesmo sem bloqueio.
+Não usa banco: GET / não faz queries e o hash é verificado em memória.
+
+Uso: python -m benchmarks.bench_login_event_loop --requests 300 --logins 40
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Optional
+
+import httpx
+
+from app.core import security
+from app.main import app
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def probe(
+    client: httpx.AsyncClient, count: int, interval: float, logins: Optional[asyncio.Task] = None
+) -> List[float]:
+    """
+    Requisições a GET / em horários fixos (uma a cada interval), com a latência medida a partir do horário
+    agendado, e não do envio: se o event loop estiver travado (bcrypt), a requisição sai atrasada e o atraso
+    entra na medida. Continua até fazer count requisições e os logins da fase terminarem.
+    """
+    latencies = []
+    started = time.perf_counter()
+    n = 0
+    while n < count or (logins is not None and not logins.done()):
+        scheduled = started + n * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        response = await client.get("/")
+        latencies.append(time.perf_counter() - scheduled)
+        assert response.status_code == 200
+        n += 1
+    return latencies
+
+
+async def blocking_logins(hashed: str, count: int, interval: float) -> None:
+    for _ in range(count):
+        security.verify_password("senha-do-teste", hashed)
+        await asyncio.sleep(interval)
+
+
+async def pooled_logins(hashed: str, count: int, interval: float, concurrency: int) -> None:
+    async def one_user() -> None:
+        for _ in range(count // concurrency):
+            await security.verify_password_async("senha-do-teste", hashed)
+            await asyncio.sleep(interval)
+    await asyncio.gather(*(one_user() for _ in range(concurrency)))
+
+
+async def main(args: argparse.Namespace) -> None:
+    hashed = security.get_password_hash("senha-do-teste")
+    interval = args.interval / 1000
+    probe_interval = args.probe_interval / 1000
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await probe(client, 20, 0) # aquecimento
+        phases = {
+            "ocioso": None,
+            "bloqueante": lambda: blocking_logins(hashed, args.logins, interval),
+            "pool": lambda: pooled_logins(hashed, args.logins, interval, args.concurrency),
+        }
+        for label, start_logins in phases.items():
+            logins = asyncio.ensure_future(start_logins()) if start_logins is not None else None
+            latencies = await probe(client, args.requests, probe_interval, logins)
+            if logins is not None:
+                await logins
+            print(
+                f"{label:>10}: GET / p50 {statistics.median(latencies) * 1000:7.2f} ms | "
+                f"p99 {percentile(latencies, 99) * 1000:7.2f} ms | máx {max(latencies) * 1000:7.2f} ms"
+            )
+    queue = security.password_hashing_stats()["queue_seconds"]
+    if queue["count"]:
+        print(f"fila do pool de hashing: média {queue['sum'] / queue['count'] * 1000:.2f} ms em {queue['count']} verificações")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="Requisições a GET / por fase")
+    parser.add_argument("--logins", type=int, default=40, help="Verificações de senha por fase")
+    parser.add_argument("--concurrency", type=int, default=4, help="Logins simultâneos na fase com pool")
+    parser.add_argument("--interval", type=float, default=1.0, help="Pausa (ms) entre os logins de cada cliente")
+    parser.add_argument("--probe-interval", type=float, default=5.0, help="Intervalo (ms) entre as requisições a GET /")
+    asyncio.run(main(parser.parse_args()))
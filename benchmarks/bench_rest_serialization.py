@@ -0,0 +1,94 @@
+# benchmarks/bench_rest_serialization.py
+"""
+Benchmark da serialização das listagens REST de materiais.
+
+Antes: objetos ORM -> validação pelo response_model (Pydantic) -> dict JSON -> json.dumps,
+que é o que o FastAPI faz com o retorno de read_all_materials.
+Depois (FAST_JSON_RESPONSES): linhas do Core com o autor em colunas rotuladas -> dict aninhado -> orjson.
+Não usa banco; mede apenas o custo de CPU por linha depois que a query retornou.
+
+Uso: python -m benchmarks.bench_rest_serialization --rows 100 --repeat 200
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import date, datetime, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.api import responses
+from app.crud import crud
+from app.models import models as orm_models
+from app.schemas import schemas as pydantic_schemas
+
+
+def build_orm_rows(count: int) -> List[orm_models.MaterialOrm]:
+    now = datetime.now(timezone.utc)
+    author = orm_models.AuthorOrm(
+        id=1, name="Autor", city="Recife", author_type=orm_models.AuthorTypeEnum.person, time_created=now
+    )
+    return [
+        orm_models.MaterialOrm(
+            id=i, title=f"Material {i}", description="Descrição " * 10,
+            material_type=orm_models.MaterialTypeEnum.book, status=orm_models.MaterialStatusEnum.published,
+            publication_date=date(2020, 1, 1), isbn=f"978-{i:09d}", pages=200,
+            author_id=author.id, author=author, uploader_id=1, time_created=now,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def as_core_rows(materials: List[orm_models.MaterialOrm]) -> List[dict]:
+    # Mesmo formato das linhas de crud._material_rows_query (colunas do autor com prefixo author__)
+    rows = []
+    for m in materials:
+        row = {column.name: getattr(m, column.name) for column in crud._MATERIAL_ROW_COLUMNS}
+        for name, label in crud._AUTHOR_ROW_LABELS:
+            row[label] = getattr(m.author, name)
+        rows.append(row)
+    return rows
+
+
+def pydantic_path(adapter: TypeAdapter, materials) -> bytes:
+    validated = adapter.validate_python(materials, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(rows) -> bytes:
+    return responses.json_response([crud.nest_author(row) for row in rows]).body
+
+
+def measure(fn, arg, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main(row_count: int, repeat: int) -> None:
+    materials = build_orm_rows(row_count)
+    rows = as_core_rows(materials)
+    adapter = TypeAdapter(List[pydantic_schemas.Material])
+
+    assert json.loads(pydantic_path(adapter, materials)) == json.loads(fast_path(rows))
+
+    before = measure(lambda arg: pydantic_path(adapter, arg), materials, repeat)
+    after = measure(fast_path, rows, repeat)
+
+    print(f"{row_count} linhas por resposta, mediana de {repeat} execuções")
+    print(f"response_model + json.dumps (antes): {row_count / before:12,.0f} linhas/s")
+    print(f"linhas do Core + orjson (depois):    {row_count / after:12,.0f} linhas/s")
+    print(f"ganho: {before / after:.2f}x (sem contar a hidratação dos objetos ORM, que o caminho rápido também evita)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
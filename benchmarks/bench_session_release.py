@@ -0,0 +1,103 @@
+# benchmarks/bench_session_release.py
+"""
+Benchmark: quantas requisições simultâneas o mesmo pool atende quando a conexão é devolvida
+logo que o endpoint termina (DBSessionRoute) em vez de ao fim da requisição.
+
+A mesma rota (GET /api/v1/materials/, listagem ORM + response_model) é montada duas vezes:
+- "presa": APIRoute padrão, a sessão fecha só depois que a resposta foi enviada;
+- "liberada": DBSessionRoute, a sessão fecha antes da serialização e do envio.
+Os clientes são lentos (cada envio do corpo leva --client-delay ms), como em redes móveis,
+e o pool é pequeno e sem overflow. Checkouts que esperam mais que --pool-timeout s falham.
+Precisa de um banco com alguns materiais (DATABASE_URL).
+
+Uso: python -m benchmarks.bench_session_release --pool-size 4 --concurrency 10 50 200
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import List, Tuple
+
+# O pool é configurado na importação do engine: os valores precisam estar no ambiente antes
+if __name__ == "__main__":
+    _pre = argparse.ArgumentParser(add_help=False)
+    _pre.add_argument("--pool-size", default="4")
+    _pre.add_argument("--pool-timeout", default="2")
+    _known, _ = _pre.parse_known_args()
+    os.environ.update(
+        DB_POOL_SIZE=_known.pool_size, DB_MAX_OVERFLOW="0", DB_POOL_TIMEOUT=_known.pool_timeout, DB_ECHO="false"
+    )
+
+from fastapi import APIRouter, FastAPI  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+
+from app.api.routers import materials  # noqa: E402
+from app.api.routing import DBSessionRoute  # noqa: E402
+from app.db import database  # noqa: E402
+from app.schemas import schemas as pydantic_schemas  # noqa: E402
+
+router = APIRouter()
+for path, route_class in (("/presa", APIRoute), ("/liberada", DBSessionRoute)):
+    router.add_api_route(
+        path, materials.read_all_materials, response_model=List[pydantic_schemas.Material],
+        route_class_override=route_class,
+    )
+app = FastAPI()
+app.include_router(router)
+
+
+async def slow_client(path: str, client_delay: float) -> bool:
+    """Faz uma requisição ASGI direta cujo 'send' simula um cliente lento. Retorna True se deu 200."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"limit=20", "root_path": "",
+        "headers": [(b"host", b"bench")], "server": ("bench", 80), "client": ("127.0.0.1", 1),
+    }
+    status_code = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            await asyncio.sleep(client_delay)
+
+    try:
+        await app(scope, receive, send)
+    except Exception: # timeout de checkout do pool vira 500 e a exceção é propagada
+        return False
+    return status_code == 200
+
+
+async def run(path: str, concurrency: int, client_delay: float) -> Tuple[int, float]:
+    started = time.perf_counter()
+    results: List[bool] = await asyncio.gather(*(slow_client(path, client_delay) for _ in range(concurrency)))
+    return sum(results), time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    await slow_client("/liberada", 0) # aquecimento (abre as conexões do pool)
+    print(
+        f"pool_size={args.pool_size} max_overflow=0 pool_timeout={args.pool_timeout}s "
+        f"cliente lento={args.client_delay:.0f}ms"
+    )
+    for concurrency in args.concurrency:
+        for label, path in (("presa", "/presa"), ("liberada", "/liberada")):
+            ok, elapsed = await run(path, concurrency, args.client_delay / 1000)
+            print(
+                f"{concurrency:>5} simultâneas | conexão {label:>8}: {ok:>5} ok, {concurrency - ok:>5} falhas "
+                f"| {elapsed:6.2f}s"
+            )
+    await database.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pool-size", type=int, default=4, help="DB_POOL_SIZE usado no teste (sem overflow)")
+    parser.add_argument("--pool-timeout", type=float, default=2.0, help="DB_POOL_TIMEOUT em segundos")
+    parser.add_argument("--client-delay", type=float, default=100.0, help="Tempo (ms) que o cliente leva para receber o corpo")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200], help="Requisições simultâneas")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,257 @@
+# scripts/import_catalog.py
+"""
+Importação offline de autores e materiais a partir de arquivos CSV ou JSONL, na velocidade do COPY.
+
+Cada bloco de --chunk-size linhas é copiado com copy_records_to_table (asyncpg) para uma tabela
+temporária e de lá entra nas tabelas reais com um único INSERT ... SELECT, então a memória fica
+limitada ao tamanho do bloco qualquer que seja o tamanho do arquivo.
+
+- Autores são deduplicados pelo nome: nomes que já existem em authors.name (ou repetidos no arquivo) são ignorados.
+- Materiais referenciam o autor por author_id ou por author_name (resolvido contra authors.name).
+  Materiais com ISBN/DOI já existentes ou com autor desconhecido são ignorados.
+
+Uso:
+    python scripts/import_catalog.py --authors autores.csv --materials materiais.jsonl
+    python scripts/import_catalog.py --materials materiais.csv --chunk-size 20000
+
+As tabelas precisam existir (python scripts/create_tables.py).
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from datetime import date
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Adiciona o diretório raiz do projeto ao sys.path
+# para permitir importações como 'from app.core.config import ...'
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import asyncpg  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.models.models import AuthorTypeEnum, MaterialStatusEnum, MaterialTypeEnum  # noqa: E402
+
+# --- Leitura dos arquivos ---
+
+def read_records(path: str) -> Iterator[Tuple[int, Union[str, Dict[str, Any]]]]:
+    """
+    Lê CSV (com cabeçalho) ou JSONL/NDJSON de forma incremental, devolvendo (linha, registro).
+    As linhas JSONL saem como texto: o parse fica em convert, junto da validação, para que uma
+    linha malformada seja rejeitada sozinha em vez de interromper a importação.
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.lower().endswith(".csv"):
+            for line_number, record in enumerate(csv.DictReader(handle), start=2):
+                yield line_number, record
+        else:
+            for line_number, line in enumerate(handle, start=1):
+                if line.strip():
+                    yield line_number, line
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _record(raw: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    if isinstance(raw, dict):
+        return raw
+    try:
+        record = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON inválido: {e.msg} (coluna {e.colno})")
+    if not isinstance(record, dict):
+        raise ValueError("a linha não é um objeto JSON")
+    return record
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _int(value: Any) -> Optional[int]:
+    value = _text(value)
+    return int(value) if value is not None else None
+
+
+def _date(value: Any) -> Optional[date]:
+    value = _text(value)
+    return date.fromisoformat(value) if value is not None else None
+
+
+def _enum(enum_class) -> Callable[[Any], Optional[str]]:
+    allowed = {member.value for member in enum_class}
+
+    def parse(value: Any) -> Optional[str]:
+        value = _text(value)
+        if value is not None and value not in allowed:
+            raise ValueError(f"valor inválido '{value}' (esperado: {', '.join(sorted(allowed))})")
+        return value
+    return parse
+
+
+# Coluna da tabela temporária -> (tipo SQL, conversor do valor lido do arquivo)
+AUTHOR_FIELDS = {
+    "name": ("text", _text),
+    "city": ("text", _text),
+    "author_type": ("text", _enum(AuthorTypeEnum)),
+}
+MATERIAL_FIELDS = {
+    "title": ("text", _text),
+    "description": ("text", _text),
+    "material_type": ("text", _enum(MaterialTypeEnum)),
+    "status": ("text", _enum(MaterialStatusEnum)),
+    "publication_date": ("date", _date),
+    "isbn": ("text", _text),
+    "pages": ("integer", _int),
+    "doi": ("text", _text),
+    "journal_name": ("text", _text),
+    "duration_seconds": ("integer", _int),
+    "video_url": ("text", _text),
+    "author_id": ("integer", _int),
+    "author_name": ("text", _text),
+}
+REQUIRED = {"authors": ("name",), "materials": ("title", "material_type")}
+
+# Os valores textuais dos enums são convertidos para os tipos enum do Postgres no INSERT ... SELECT
+INSERT_AUTHORS = """
+    INSERT INTO authors (name, city, author_type)
+    SELECT DISTINCT ON (s.name) s.name, s.city, coalesce(s.author_type, 'person')::authortypeenum
+    FROM _import_authors s
+    WHERE NOT EXISTS (SELECT 1 FROM authors a WHERE a.name = s.name)
+    ORDER BY s.name
+"""
+INSERT_MATERIALS = """
+    INSERT INTO materials (
+        title, description, material_type, status, publication_date, isbn, pages, doi,
+        journal_name, duration_seconds, video_url, author_id
+    )
+    SELECT
+        s.title, s.description, s.material_type::materialtypeenum,
+        coalesce(s.status, 'draft')::materialstatusenum, s.publication_date, s.isbn, s.pages, s.doi,
+        s.journal_name, s.duration_seconds, s.video_url, a.id
+    FROM _import_materials s
+    JOIN authors a ON a.id = coalesce(
+        s.author_id, (SELECT min(x.id) FROM authors x WHERE x.name = s.author_name)
+    )
+    ON CONFLICT DO NOTHING
+"""
+
+
+class Progress:
+    """Acumula contadores de uma etapa e imprime a vazão a cada bloco."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.read = self.inserted = self.rejected = 0
+        self.started = time.perf_counter()
+
+    def report(self, final: bool = False) -> None:
+        elapsed = time.perf_counter() - self.started
+        rate = self.read / elapsed if elapsed > 0 else 0.0
+        prefix = "Concluído" if final else "Progresso"
+        print(
+            f"[{self.label}] {prefix}: {self.read} lidos, {self.inserted} inseridos, "
+            f"{self.read - self.inserted - self.rejected} ignorados, {self.rejected} rejeitados "
+            f"- {rate:,.0f} linhas/s ({elapsed:.1f}s)",
+            flush=True,
+        )
+
+
+def convert(
+    kind: str,
+    fields: Dict[str, Tuple[str, Callable]],
+    chunk: List[Tuple[int, Union[str, Dict[str, Any]]]],
+    progress: Progress,
+) -> List[tuple]:
+    """Converte e valida um bloco; linhas inválidas são contadas como rejeitadas e reportadas no stderr."""
+    required = [(column, list(fields).index(column)) for column in REQUIRED[kind]]
+    records = []
+    for line_number, raw in chunk:
+        try:
+            values = _record(raw)
+            record = tuple(parse(values.get(column)) for column, (_, parse) in fields.items())
+            missing = [column for column, position in required if record[position] is None]
+            if missing:
+                raise ValueError(f"campos obrigatórios ausentes: {', '.join(missing)}")
+        except ValueError as e:
+            progress.rejected += 1
+            if progress.rejected <= 20:
+                print(f"[{kind}] linha {line_number} rejeitada: {e}", file=sys.stderr)
+            continue
+        records.append(record)
+    return records
+
+
+async def import_file(
+    conn: asyncpg.Connection, kind: str, path: str, chunk_size: int
+) -> Progress:
+    fields = AUTHOR_FIELDS if kind == "authors" else MATERIAL_FIELDS
+    staging = f"_import_{kind}"
+    insert_sql = INSERT_AUTHORS if kind == "authors" else INSERT_MATERIALS
+    columns = ", ".join(f"{column} {sql_type}" for column, (sql_type, _) in fields.items())
+    # Tabela temporária esvaziada a cada commit: cada bloco é uma transação
+    await conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {staging} ({columns}) ON COMMIT DELETE ROWS")
+
+    progress = Progress(kind)
+    for chunk in chunked(read_records(path), chunk_size):
+        progress.read += len(chunk)
+        records = convert(kind, fields, chunk, progress)
+        if records:
+            async with conn.transaction():
+                await conn.copy_records_to_table(staging, records=records, columns=list(fields))
+                status = await conn.execute(insert_sql)
+            progress.inserted += int(status.split()[-1]) # "INSERT 0 <linhas>"
+        progress.report()
+    progress.report(final=True)
+    return progress
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    # DATABASE_URL usa o dialeto do SQLAlchemy (postgresql+asyncpg://); o asyncpg quer postgresql://
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def main(args: argparse.Namespace) -> None:
+    conn = await asyncpg.connect(asyncpg_dsn(args.database_url or settings.DATABASE_URL))
+    try:
+        # Autores primeiro, para que os materiais encontrem author_name
+        if args.authors:
+            await import_file(conn, "authors", args.authors, args.chunk_size)
+        if args.materials:
+            await import_file(conn, "materials", args.materials, args.chunk_size)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--authors", help="Arquivo de autores (.csv ou .jsonl): name, city, author_type")
+    parser.add_argument(
+        "--materials",
+        help="Arquivo de materiais (.csv ou .jsonl): campos de MaterialCreate, com author_id ou author_name",
+    )
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Linhas por bloco de COPY (padrão: 10000)")
+    parser.add_argument("--database-url", help="Sobrescreve DATABASE_URL das configurações")
+    args = parser.parse_args()
+    if not args.authors and not args.materials:
+        parser.error("informe --authors e/ou --materials")
+    print("Executando importação do catálogo...")
+    asyncio.run(main(args))
+    print("Importação do catálogo finalizada.")
@@ -0,0 +1,24 @@
+# tests/test_auth.py
+"""Login: a conexão com o banco é devolvida ao pool antes da verificação da senha (bcrypt)."""
+import pytest
+
+from app.core import security
+from app.db.database import engine
+from tests.conftest import TEST_PASSWORD, TEST_USERNAME
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("password, status_code", [(TEST_PASSWORD, 200), ("senha-errada", 401)])
+async def test_login_releases_connection_before_hashing(client, auth_headers, monkeypatch, password, status_code):
+    checked_out = []
+    verify_password_async = security.verify_password_async
+
+    async def verify_and_record(plain_password: str, hashed_password: str) -> bool:
+        checked_out.append(engine.pool.checkedout())
+        return await verify_password_async(plain_password, hashed_password)
+
+    monkeypatch.setattr(security, "verify_password_async", verify_and_record)
+    response = await client.post("/api/v1/auth/token", data={"username": TEST_USERNAME, "password": password})
+    assert response.status_code == status_code, response.text
+    assert checked_out == [0]
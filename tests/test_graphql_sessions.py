@@ -0,0 +1,34 @@
+# tests/test_graphql_sessions.py
+"""GraphQL: só queries com campos de dados criam a sessão de leitura (e checam o atraso da réplica)."""
+import pytest
+
+from app.graphql import context as graphql_context
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def read_sessions(monkeypatch):
+    """Conta as chamadas a get_read_sessionmaker feitas pelo contexto GraphQL."""
+    calls = []
+    get_read_sessionmaker = graphql_context.get_read_sessionmaker
+
+    async def counted():
+        calls.append(1)
+        return await get_read_sessionmaker()
+
+    monkeypatch.setattr(graphql_context, "get_read_sessionmaker", counted)
+    return calls
+
+
+@pytest.mark.parametrize("query, read_session", [
+    ("{ materials(limit: 5) { id title } }", True),
+    ("{ __schema { queryType { name } } }", False),
+    ("{ __typename }", False),
+    ('mutation { createAuthor(authorData: {name: "Autor GraphQL"}) { id } }', False),
+])
+async def test_read_session_only_for_data_queries(client, read_sessions, query, read_session):
+    response = await client.post("/graphql", json={"query": query})
+    assert response.status_code == 200, response.text
+    assert not response.json().get("errors"), response.json()["errors"]
+    assert len(read_sessions) == int(read_session)
@@ -0,0 +1,171 @@
+# tests/test_material_filter_plans.py
+"""
+Confere com EXPLAIN que cada combinação de filtros e ordenação da listagem de materiais
+(GET /api/v1/materials/ e as queries GraphQL materials/materialsPage) lê a tabela materials pelo índice
+esperado, na primeira página e na página seguinte (cursor).
+
+O catálogo sintético é inserido em uma transação desfeita no fim do módulo e analisado (ANALYZE),
+para que o planejador escolha como faria com um catálogo grande. As queries são montadas por
+crud.materials_rows_query, as mesmas usadas pelas rotas.
+"""
+from datetime import date
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.crud import crud
+from app.crud.pagination import Cursor
+from app.db.base_class import Base
+from app.db.database import engine
+from app.models.models import MaterialStatusEnum, MaterialTypeEnum
+from app.schemas.schemas import MaterialFilters, MaterialSortEnum
+from tests.conftest import TEST_DATABASE_URL
+
+pytestmark = pytest.mark.anyio
+
+ROWS = 50_000
+AUTHORS = 2_000
+PAGE_SIZE = 10
+
+# Autores, usuários e materiais sintéticos: ~10% dos materiais têm uploader e ~5% não têm data
+_SEED_SQL = [
+    """
+    INSERT INTO users (username, email, hashed_password, is_active, is_superuser)
+    SELECT 'explain_user_' || n, 'explain_user_' || n || '@example.com', 'x', true, false
+    FROM generate_series(1, 20) AS n
+    """,
+    """
+    INSERT INTO authors (name, author_type)
+    SELECT 'Explain Author ' || n, 'person' FROM generate_series(1, :authors) AS n
+    """,
+    """
+    INSERT INTO materials (title, material_type, status, publication_date, author_id, uploader_id)
+    SELECT
+        'Explain Material ' || md5(n::text),
+        (ARRAY['book', 'article', 'video'])[1 + n % 3]::materialtypeenum,
+        (ARRAY['draft', 'published', 'archived'])[1 + (n / 3) % 3]::materialstatusenum,
+        CASE WHEN n % 20 = 0 THEN NULL ELSE date '1995-01-01' + (n * 7919) % 11000 END,
+        (SELECT min(id) FROM authors WHERE name LIKE 'Explain Author %') + n % :authors,
+        CASE WHEN n % 10 = 0 THEN (SELECT min(id) FROM users WHERE username LIKE 'explain_user_%') + n % 20 END
+    FROM generate_series(1, :rows) AS n
+    """,
+]
+
+_SORT_INDEXES = {
+    "id": "ix_materials_id",
+    "publication_date": "ix_materials_publication_date",
+    "title": "ix_materials_title",
+}
+
+_SINCE, _UNTIL = date(2005, 1, 1), date(2006, 12, 31)
+FILTER_CASES = {
+    "sem filtros": {},
+    "status": {"status": MaterialStatusEnum.published},
+    "material_type": {"material_type": MaterialTypeEnum.book},
+    "author_id": {"author_id": "author"},
+    "uploader_id": {"uploader_id": "uploader"},
+    "publication_date": {"published_from": _SINCE, "published_to": _UNTIL},
+    "status + publication_date": {"status": MaterialStatusEnum.published, "published_from": _SINCE, "published_to": _UNTIL},
+    "status + material_type": {"status": MaterialStatusEnum.published, "material_type": MaterialTypeEnum.article},
+    "author_id + status": {"author_id": "author", "status": MaterialStatusEnum.published},
+}
+
+
+def expected_indexes(filters: MaterialFilters, sort: MaterialSortEnum) -> Set[str]:
+    """
+    Índices aceitáveis para a combinação: o índice da ordenação (a página sai lida na ordem) ou o de
+    um filtro presente. Com cursor, o planejador pode preferir o índice da ordenação mesmo filtrando
+    por autor, porque o keyset já começa perto do fim da página.
+    """
+    indexes = {_SORT_INDEXES[crud.material_sort_field(sort)]}
+    if filters.author_id is not None:
+        indexes.add("ix_materials_author_id")
+    if filters.status is not None:
+        indexes.add("ix_materials_status_publication_date")
+    if filters.material_type is not None:
+        indexes.add("ix_materials_material_type")
+    if filters.uploader_id is not None:
+        indexes.add("ix_materials_uploader_id")
+    if filters.published_from is not None or filters.published_to is not None:
+        indexes.add("ix_materials_publication_date")
+    return indexes
+
+
+def _relation_scans(plan: Dict[str, Any], relation: str) -> List[Tuple[str, List[str]]]:
+    """(tipo do nó, índices) de cada leitura da tabela relation no plano."""
+    scans = []
+    if plan.get("Relation Name") == relation:
+        # Num Bitmap Heap Scan os índices ficam nos nós Bitmap Index Scan filhos
+        indexes = [plan["Index Name"]] if "Index Name" in plan else list(_bitmap_indexes(plan))
+        scans.append((plan["Node Type"], indexes))
+    for child in plan.get("Plans", []):
+        scans.extend(_relation_scans(child, relation))
+    return scans
+
+
+def _bitmap_indexes(plan: Dict[str, Any]) -> Iterator[str]:
+    for child in plan.get("Plans", []):
+        if "Index Name" in child:
+            yield child["Index Name"]
+        yield from _bitmap_indexes(child)
+
+
+async def _explain(conn, query) -> Dict[str, Any]:
+    # Valores literais: o plano é o de uma execução com esses parâmetros, não o plano genérico
+    sql = str(query.limit(PAGE_SIZE + 1).compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    return result.scalar()[0]["Plan"]
+
+
+@pytest.fixture(scope="module")
+def anyio_backend():
+    # O catálogo sintético é criado uma vez para o módulo inteiro, no mesmo event loop dos testes
+    return "asyncio"
+
+
+@pytest.fixture(scope="module")
+async def explain_conn():
+    """Conexão com o catálogo sintético, dentro de uma transação desfeita no fim do módulo."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("Defina TEST_DATABASE_URL (um banco descartável) para os testes de plano de execução")
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            await conn.run_sync(Base.metadata.create_all)
+            for statement in _SEED_SQL:
+                await conn.execute(text(statement), {"rows": ROWS, "authors": AUTHORS})
+            for table in ("materials", "authors", "users"):
+                await conn.execute(text(f"ANALYZE {table}"))
+            ids = (await conn.execute(text("SELECT max(author_id), max(uploader_id) FROM materials"))).one()
+            yield conn, {"author": ids[0], "uploader": ids[1]}
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+
+@pytest.mark.parametrize("sort", list(MaterialSortEnum), ids=lambda sort: sort.value)
+@pytest.mark.parametrize("case", list(FILTER_CASES))
+async def test_materials_listing_uses_expected_index(explain_conn, case, sort):
+    conn, ids = explain_conn
+    filters = MaterialFilters(**{key: ids.get(value, value) for key, value in FILTER_CASES[case].items()})
+    expected = expected_indexes(filters, sort)
+
+    # Primeira página e a página seguinte (keyset a partir da última linha da primeira)
+    first_page = crud.materials_rows_query(filters=filters, sort=sort).limit(PAGE_SIZE)
+    page_rows = (await conn.execute(first_page)).mappings().all()
+    assert page_rows, case
+    last = page_rows[-1]
+    cursor = Cursor(sort.value, last[crud.material_sort_field(sort)], last["id"])
+    pages = {
+        "primeira página": crud.materials_rows_query(filters=filters, sort=sort),
+        "com cursor": crud.materials_rows_query(filters=filters, sort=sort, after=cursor),
+    }
+    for page, query in pages.items():
+        scans = _relation_scans(await _explain(conn, query), "materials")
+        assert scans, f"{case} | sort={sort.value} | {page}: materials não aparece no plano"
+        for node, indexes in scans:
+            assert node != "Seq Scan" and expected.intersection(indexes), (
+                f"{case} | sort={sort.value} | {page}: {node} {'+'.join(indexes)} (esperado: {sorted(expected)})"
+            )
@@ -0,0 +1,40 @@
+# tests/test_pagination.py
+"""Cursores de paginação: um cursor adulterado vira 400 (InvalidCursorError), nunca um erro do banco."""
+from datetime import date
+
+import pytest
+
+from app.crud import pagination
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("sort_key, value", [
+    ("id", 42),
+    ("-title", "Dados abertos"),
+    ("publication_date", date(2001, 5, 17)),
+    ("-publication_date", None),
+    ("rank", 0.25),
+])
+def test_cursor_round_trip(sort_key, value):
+    assert pagination.decode_cursor(pagination.encode_cursor(sort_key, value, 7)) == (sort_key, value, 7)
+
+
+@pytest.mark.parametrize("sort_key, value", [
+    ("publication_date", "2001-05-17"),
+    ("title", 3),
+    ("-id", "42"),
+    ("id", True),
+    ("rank", "alto"),
+    ("author_id", 1),
+])
+def test_cursor_value_must_match_sort_key(sort_key, value):
+    with pytest.raises(pagination.InvalidCursorError):
+        pagination.decode_cursor(pagination.encode_cursor(sort_key, value, 7))
+
+
+async def test_tampered_cursor_is_bad_request(client):
+    after = pagination.encode_cursor("publication_date", "não é uma data", 1)
+    response = await client.get("/api/v1/materials/", params={"sort": "publication_date", "after": after})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor 'after' inválido"
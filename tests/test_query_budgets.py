@@ -0,0 +1,87 @@
+# tests/test_query_budgets.py
+"""
+Orçamento de queries SQL por rota REST e por operação GraphQL, para pegar regressões N+1: o catálogo
+de teste tem vários autores e materiais, então carregar relações item a item estoura o orçamento.
+Ao estourar, a falha lista os statements executados.
+
+Para mudar um orçamento de propósito (ex: uma rota passou a precisar de mais uma query), ajuste a tabela
+abaixo junto com a mudança e explique o motivo no commit.
+"""
+import pytest
+
+from tests.conftest import count_queries
+
+pytestmark = pytest.mark.anyio
+
+# (rota, parâmetros, queries no máximo). Rotas autenticadas contam a busca do usuário do token
+# (o cache de principals fica desligado nos testes).
+REST_BUDGETS = [
+    ("GET /api/v1/materials/", {"limit": 100}, 2), # materiais + autores em lote
+    ("GET /api/v1/materials/", {"limit": 5, "status": "published", "sort": "-publication_date"}, 2),
+    ("GET /api/v1/materials/", {"limit": 5, "include_total": "true"}, 3),
+    ("GET /api/v1/materials/{material_id}", {}, 2),
+    ("GET /api/v1/materials/search", {"q": "dados"}, 1), # ranking, trechos e autor na mesma query
+    ("GET /api/v1/authors/", {"limit": 100}, 1),
+    ("GET /api/v1/authors/{author_id}", {}, 1),
+    ("GET /api/v1/authors/suggest", {"prefix": "Aut"}, 1),
+    ("GET /api/v1/users/me", {}, 2),
+]
+
+# (operação, query, queries no máximo)
+GRAPHQL_BUDGETS = [
+    ("materials(limit:100){author{name}}", "{ materials(limit: 100) { title author { name } } }", 2),
+    ("materialsPage{author}", "{ materialsPage(limit: 100) { items { id author { id name } } nextCursor } }", 2),
+    ("material{author}", "query($id: Int!) { material(id: $id) { title author { name } } }", 2),
+    ("authors{materials}", "{ authors(limit: 100) { name materials { title } } }", 2),
+    ("authorsPage{materials{author}}", "{ authorsPage { items { materials { id author { name } } } } }", 2),
+    ("searchMaterials{author}", '{ searchMaterials(q: "dados") { items { title author { name } } } }', 1),
+]
+
+
+def _path(template: str, catalog: dict) -> str:
+    return template.format(material_id=catalog["material_ids"][-1], author_id=catalog["author_ids"][-1])
+
+
+@pytest.mark.parametrize("route, params, budget", REST_BUDGETS)
+async def test_rest_route_query_budget(client, auth_headers, catalog, route, params, budget):
+    method, template = route.split(" ")
+    with count_queries() as queries:
+        response = await client.request(method, _path(template, catalog), params=params, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    queries.assert_at_most(budget, route)
+
+
+@pytest.mark.parametrize("operation, query, budget", GRAPHQL_BUDGETS)
+async def test_graphql_operation_query_budget(client, catalog, operation, query, budget):
+    variables = {"id": catalog["material_ids"][0]} if "$id" in query else None
+    with count_queries() as queries:
+        response = await client.post("/graphql", json={"query": query, "variables": variables})
+    assert response.status_code == 200, response.text
+    assert not response.json().get("errors"), response.json()["errors"]
+    queries.assert_at_most(budget, operation)
+
+
+async def test_register_user_query_budget(client):
+    with count_queries() as queries:
+        response = await client.post(
+            "/api/v1/users/", json={"username": "bob", "email": "bob@example.com", "password": "password123"}
+        )
+    assert response.status_code == 201, response.text
+    # INSERT ... RETURNING; duplicidade de username/email vem da violação de unicidade, sem buscas antes
+    queries.assert_at_most(1, "POST /api/v1/users/")
+
+
+async def test_create_material_query_budget(client, auth_headers, catalog):
+    material = {"title": "Novo", "material_type": "book", "author_id": catalog["author_ids"][0]}
+    with count_queries() as queries:
+        response = await client.post("/api/v1/materials/", json=material, headers=auth_headers)
+    assert response.status_code == 201, response.text
+    queries.assert_at_most(2, "POST /api/v1/materials/")
+
+
+async def test_budget_failure_lists_statements(client, catalog):
+    with count_queries() as queries:
+        for material_id in catalog["material_ids"][:3]:
+            await client.get(f"/api/v1/materials/{material_id}")
+    with pytest.raises(AssertionError, match=r"(?s)3 materiais.*orçamento é 1.*1\. SELECT"):
+        queries.assert_at_most(1, "3 materiais")